@@ -2,11 +2,12 @@ from typing import List, Dict, Set
 from src.models.account_profile import AccountProfile
 from src.models.network_profile import NetworkProfile
 from src.models.ring_detail import RingDetail
+from src.core.csr_graph import CsrGraph
 
 class NetworkBuilder:
-    def __init__(self, accounts: Dict[str, AccountProfile], adjacency_list: Dict[str, List[Dict]]):
+    def __init__(self, accounts: Dict[str, AccountProfile], graph: CsrGraph):
         self.accounts = accounts
-        self.adjacency_list = adjacency_list
+        self.graph = graph
         self.networks: List[NetworkProfile] = []
 
     def built_networks(self, name: str, detail: RingDetail) :
@@ -25,9 +26,9 @@ class NetworkBuilder:
             cluster.append(node)
             
             # check neighbors
-            if node in self.adjacency_list:
-                for edge in self.adjacency_list[node]:
-                    neighbor = edge['receiver']
+            start, end = self.graph.out_range(self.graph.index[node])
+            if start < end:
+                for neighbor in self.graph.account_ids[self.graph.out_neighbors[start:end]].tolist():
                     if neighbor in allowed_set and neighbor not in visited:
                         visited.add(neighbor)
                         queue.append(neighbor)
@@ -0,0 +1,169 @@
+from collections.abc import Mapping
+from typing import Dict, List, Any
+import numpy as np
+from src.models.transaction_batch import TransactionBatch
+
+class CsrGraph:
+    """
+    Array-backed transaction graph with integer node ids (compressed sparse row).
+
+    Node n's outgoing edges are out_*[out_offsets[n]:out_offsets[n+1]] and its incoming
+    edges in_*[in_offsets[n]:in_offsets[n+1]], each sorted by timestamp. *_edges holds
+    the transaction index into the time-sorted batch the graph was built from.
+    """
+
+    def __init__(self, batch: TransactionBatch):
+        self.batch = batch
+        self.account_ids = batch.account_ids
+        self.num_nodes = len(batch.account_ids)
+        self.num_edges = len(batch)
+        self.index: Dict[str, int] = {account_id: i for i, account_id in enumerate(batch.account_ids.tolist())}
+
+        self._counterparties = {}
+        self._burst_index = {}
+
+        node_dtype = np.int32 if max(self.num_nodes, self.num_edges) < np.iinfo(np.int32).max else np.int64
+        (self.out_offsets, self.out_neighbors, self.out_amounts,
+         self.out_timestamps, self.out_edges) = self._compress(batch.sender, batch.receiver, node_dtype)
+        (self.in_offsets, self.in_neighbors, self.in_amounts,
+         self.in_timestamps, self.in_edges) = self._compress(batch.receiver, batch.sender, node_dtype)
+
+    def _compress(self, source: np.ndarray, target: np.ndarray, node_dtype):
+        # lexsort is stable, so edges sharing a timestamp keep their transaction order
+        order = np.lexsort((self.batch.timestamp, source))
+        counts = np.bincount(source, minlength=self.num_nodes)
+        offsets = np.zeros(self.num_nodes + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        return (
+            offsets,
+            target[order].astype(node_dtype),
+            self.batch.amount[order],
+            self.batch.timestamp[order],
+            order.astype(node_dtype),
+        )
+
+    def out_range(self, node: int):
+        return self.out_offsets[node], self.out_offsets[node + 1]
+
+    def in_range(self, node: int):
+        return self.in_offsets[node], self.in_offsets[node + 1]
+
+    def out_degree(self) -> np.ndarray:
+        return np.diff(self.out_offsets)
+
+    def in_degree(self) -> np.ndarray:
+        return np.diff(self.in_offsets)
+
+    def counterparties(self, outgoing: bool = True):
+        """
+        Distinct counterparties per node as (offsets, neighbors) in CSR layout, i.e. the
+        unique_receivers (outgoing) or unique_senders sets. Computed once and cached.
+        """
+        if outgoing not in self._counterparties:
+            source, target = (self.batch.sender, self.batch.receiver) if outgoing else (self.batch.receiver, self.batch.sender)
+            n = max(self.num_nodes, 1)
+            pairs = np.unique(source.astype(np.int64) * n + target)
+            owners = pairs // n
+            offsets = np.zeros(self.num_nodes + 1, dtype=np.int64)
+            np.cumsum(np.bincount(owners, minlength=self.num_nodes), out=offsets[1:])
+            self._counterparties[outgoing] = (offsets, (pairs % n).astype(self.out_neighbors.dtype))
+        return self._counterparties[outgoing]
+
+    def burst_index(self, outgoing: bool, time_limit: np.timedelta64):
+        """
+        Burst edges per node, for DispersalDetector. An edge is in a burst when the
+        node's previous or next edge (same direction, time order) is at most time_limit
+        away. Returns (has_burst, offsets, neighbors): whether each node has any burst
+        edge, and its distinct burst counterparties in CSR layout, in the order they are
+        first met along the node's edges. Computed once per direction and cached.
+        """
+        key = (outgoing, time_limit)
+        if key not in self._burst_index:
+            if outgoing:
+                offsets, neighbors, timestamps = self.out_offsets, self.out_neighbors, self.out_timestamps
+            else:
+                offsets, neighbors, timestamps = self.in_offsets, self.in_neighbors, self.in_timestamps
+            owners = np.repeat(np.arange(self.num_nodes, dtype=np.int64), np.diff(offsets))
+
+            # Consecutive gaps, only between edges of the same node
+            close = (np.diff(timestamps) <= time_limit) & (owners[1:] == owners[:-1])
+            in_burst = np.zeros(len(timestamps), dtype=bool)
+            in_burst[:-1] |= close
+            in_burst[1:] |= close
+
+            # Keep the first occurrence of each (owner, neighbor) pair, in edge order
+            burst_owners = owners[in_burst]
+            burst_neighbors = neighbors[in_burst]
+            n = max(self.num_nodes, 1)
+            _, first = np.unique(burst_owners * n + burst_neighbors, return_index=True)
+            first.sort()
+            counts = np.bincount(burst_owners[first], minlength=self.num_nodes)
+            burst_offsets = np.zeros(self.num_nodes + 1, dtype=np.int64)
+            np.cumsum(counts, out=burst_offsets[1:])
+            has_burst = np.bincount(burst_owners, minlength=self.num_nodes) > 0
+            self._burst_index[key] = (has_burst, burst_offsets, burst_neighbors[first])
+        return self._burst_index[key]
+
+    def counterparty_offsets(self, outgoing: bool = True) -> np.ndarray:
+        return self.counterparties(outgoing)[0]
+
+    def counterparty_ids(self, node: int, outgoing: bool = True) -> List[str]:
+        offsets, neighbors = self.counterparties(outgoing)
+        return self.account_ids[neighbors[offsets[node]:offsets[node + 1]]].tolist()
+
+    def adjacency_view(self) -> "AdjacencyView":
+        return AdjacencyView(self, outgoing=True)
+
+    def reverse_adjacency_view(self) -> "AdjacencyView":
+        return AdjacencyView(self, outgoing=False)
+
+
+class AdjacencyView(Mapping):
+    """
+    Read-only dict-of-lists view of one direction of a CsrGraph, in the edge-dict format
+    GraphBuilder used to produce. Lists are materialized per lookup, so this is for
+    compatibility, not for hot loops.
+    """
+
+    def __init__(self, graph: CsrGraph, outgoing: bool):
+        self.graph = graph
+        self.outgoing = outgoing
+        if outgoing:
+            self.offsets, self.neighbors = graph.out_offsets, graph.out_neighbors
+            self.amounts, self.timestamps, self.edges = graph.out_amounts, graph.out_timestamps, graph.out_edges
+            self.neighbor_key = "receiver"
+        else:
+            self.offsets, self.neighbors = graph.in_offsets, graph.in_neighbors
+            self.amounts, self.timestamps, self.edges = graph.in_amounts, graph.in_timestamps, graph.in_edges
+            self.neighbor_key = "sender"
+        self.nodes = np.flatnonzero(np.diff(self.offsets))
+
+    def __getitem__(self, account_id: str) -> List[Dict[str, Any]]:
+        node = self.graph.index[account_id]
+        start, end = self.offsets[node], self.offsets[node + 1]
+        if start == end:
+            raise KeyError(account_id)
+        return [
+            {
+                self.neighbor_key: neighbor,
+                "amount": amount,
+                "timestamp": timestamp,
+                "transaction_id": tx_id,
+            }
+            for neighbor, amount, timestamp, tx_id in zip(
+                self.graph.account_ids[self.neighbors[start:end]].tolist(),
+                self.amounts[start:end].tolist(),
+                self.timestamps[start:end].tolist(),
+                self.graph.batch.transaction_ids[self.edges[start:end]].tolist(),
+            )
+        ]
+
+    def __contains__(self, account_id) -> bool:
+        node = self.graph.index.get(account_id)
+        return node is not None and self.offsets[node] != self.offsets[node + 1]
+
+    def __iter__(self):
+        return iter(self.graph.account_ids[self.nodes].tolist())
+
+    def __len__(self):
+        return len(self.nodes)
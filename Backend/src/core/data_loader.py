@@ -1,9 +1,15 @@
 import csv
+import itertools
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Iterator
+import numpy as np
 from src.models.transaction import Transaction
+from src.models.transaction_batch import TransactionBatch
 
 class DataLoader:
+    COLUMNS = ("transaction_id", "sender_id", "receiver_id", "amount", "timestamp")
+    TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
     def __init__(self, file_path: str):
         self.file_path = file_path
 
@@ -50,3 +56,133 @@ class DataLoader:
         except Exception as e:
             print(f"Error loading data: {e}")
             return {}
+
+    def load_columns(self) -> TransactionBatch:
+        """
+        Columnar loading mode: parses the CSV straight into NumPy arrays with
+        dictionary-encoded account ids and datetime64 timestamps, sorted by time, one row
+        per transaction id (the last one, as in load_transactions).
+        """
+        try:
+            with open(self.file_path, mode='r', encoding='utf-8', newline='') as csvfile:
+                reader = csv.reader(csvfile)
+                header = [name.strip() for name in next(reader)]
+                rows = [row for row in reader if row]
+
+            batch = self._rows_to_batch(header, rows).sorted_by_time()
+            print(f"Loaded {len(batch)} transactions.")
+            return batch
+
+        except FileNotFoundError:
+            print(f"Error: File not found at {self.file_path}")
+            return TransactionBatch.empty()
+        except Exception as e:
+            print(f"Error loading data: {e}")
+            return TransactionBatch.empty()
+
+    def iter_chunks(self, chunk_size: int = 100000) -> Iterator[TransactionBatch]:
+        """
+        Streaming mode: yields TransactionBatch chunks of at most chunk_size rows in file
+        order, so only one chunk of parsed rows is held at a time. Chunks are not time
+        sorted and carry their own account dictionary; GraphBuilder.add_chunk merges them.
+        """
+        loaded = 0
+        try:
+            with open(self.file_path, mode='r', encoding='utf-8', newline='') as csvfile:
+                reader = csv.reader(csvfile)
+                header = [name.strip() for name in next(reader)]
+                while True:
+                    chunk = list(itertools.islice(reader, chunk_size))
+                    if not chunk:
+                        break
+                    batch = self._rows_to_batch(header, [row for row in chunk if row])
+                    loaded += len(batch)
+                    yield batch
+
+        except FileNotFoundError:
+            print(f"Error: File not found at {self.file_path}")
+            return
+        except Exception as e:
+            print(f"Error loading data: {e}")
+            return
+        print(f"Loaded {loaded} transactions.")
+
+    def _rows_to_batch(self, header: List[str], rows: List[List[str]]) -> TransactionBatch:
+        position = {name: i for i, name in enumerate(header)}
+        tx_col, sender_col, receiver_col, amount_col, ts_col = (position[name] for name in self.COLUMNS)
+
+        width = max(tx_col, sender_col, receiver_col, amount_col, ts_col) + 1
+        if any(len(row) < width for row in rows):
+            for row in rows:
+                if len(row) < width:
+                    print(f"Skipping row with missing fields: {row}")
+            rows = [row for row in rows if len(row) >= width]
+
+        timestamps = np.char.strip(np.array([row[ts_col] for row in rows], dtype=str))
+        parsed, valid = self._parse_timestamps(timestamps)
+        if not valid.all():
+            for i in np.flatnonzero(~valid):
+                print(f"Skipping row with invalid timestamp: {dict(zip(header, rows[i]))}")
+            rows = [row for row, ok in zip(rows, valid) if ok]
+            parsed = parsed[valid]
+
+        codes, account_ids = self._encode_accounts(
+            [row[sender_col] for row in rows] + [row[receiver_col] for row in rows]
+        )
+        return TransactionBatch(
+            transaction_ids=np.char.strip(np.array([row[tx_col] for row in rows], dtype=str)),
+            sender=codes[:len(rows)],
+            receiver=codes[len(rows):],
+            amount=np.array([row[amount_col] for row in rows], dtype=str).astype(np.float64),
+            timestamp=parsed,
+            account_ids=account_ids,
+        )
+
+    def _parse_timestamps(self, values: np.ndarray):
+        """
+        Bulk-parses 'YYYY-MM-DD H:MM:SS' strings into datetime64[s].
+        Rows that don't fit the fixed layout fall back to strptime, so the accepted
+        set matches load_transactions. Returns (timestamps, valid_mask).
+        """
+        parsed = np.full(len(values), np.datetime64("NaT"), dtype="datetime64[s]")
+        valid = np.zeros(len(values), dtype=bool)
+        if len(values) == 0:
+            return parsed, valid
+
+        parts = np.char.partition(values, " ")
+        dates = parts[:, 0]
+        times = np.char.zfill(parts[:, 2], 8)
+        fast = (np.char.str_len(dates) == 10) & (np.char.str_len(times) == 8) & (np.char.count(times, ":") == 2)
+
+        if fast.any():
+            try:
+                iso = np.char.add(np.char.add(dates[fast], "T"), times[fast])
+                parsed[fast] = iso.astype("datetime64[s]")
+                valid[fast] = True
+                valid &= ~np.isnat(parsed)
+            except ValueError:
+                valid[fast] = False
+
+        for i in np.flatnonzero(~valid):
+            try:
+                parsed[i] = np.datetime64(datetime.strptime(str(values[i]), self.TIMESTAMP_FORMAT), "s")
+                valid[i] = True
+            except ValueError:
+                continue
+        return parsed, valid
+
+    @staticmethod
+    def _encode_accounts(values: List[str]):
+        """Dictionary-encodes account ids. Returns (codes, account_ids)."""
+        lookup: Dict[str, int] = {}
+        codes = np.fromiter((lookup.setdefault(v, len(lookup)) for v in values), dtype=np.int64, count=len(values))
+
+        # Strip once per distinct id rather than per row, then fold together ids
+        # that only differed by surrounding whitespace.
+        stripped: Dict[str, int] = {}
+        remap = np.fromiter((stripped.setdefault(v.strip(), len(stripped)) for v in lookup), dtype=np.int64, count=len(lookup))
+        if len(stripped) != len(lookup):
+            codes = remap[codes]
+        account_ids = np.empty(len(stripped), dtype=object)
+        account_ids[:] = list(stripped)
+        return codes, account_ids
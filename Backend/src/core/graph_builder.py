@@ -1,65 +1,72 @@
-from datetime import timedelta
-from typing import List, Dict, Any
+from typing import List, Dict, Union
+import numpy as np
 from src.models.transaction import Transaction
-from src.models.account_profile import AccountProfile
+from src.models.transaction_batch import TransactionBatch
+from src.models.account_store import AccountStore
+from src.core.csr_graph import CsrGraph
 
 class GraphBuilder:
-    def __init__(self, transactions: Dict[str, Transaction]):
+    def __init__(self, transactions: Union[Dict[str, Transaction], TransactionBatch] = None):
         self.transactions = transactions
-        self.accounts: Dict[str, AccountProfile] = {}
-        self.adjacency_list: Dict[str, List[Dict[str, Any]]] = {}
-        self.reverse_adjacency_list: Dict[str, List[Dict[str, Any]]] = {}
+        self.accounts: AccountStore = None
+        self.graph: CsrGraph = None
+        # Compatibility views over self.graph in the old dict-of-lists edge format
+        self.adjacency_list = {}
+        self.reverse_adjacency_list = {}
+        # Streaming state: chunks re-coded against one builder-wide account table
+        self._chunks: List[TransactionBatch] = []
+        self._account_index: Dict[str, int] = {}
 
     def build_graph(self):
         print("Building graph and account profiles...")
-        for tx_id, tx in self.transactions.items():
-            # Update Sender Profile
-            if tx.sender_id not in self.accounts:
-                self.accounts[tx.sender_id] = AccountProfile(account_id=tx.sender_id)
-            self.accounts[tx.sender_id].update(
-                amount=tx.amount, 
-                is_sender=True, 
-                counterparty=tx.receiver_id, 
-                timestamp=tx.timestamp
-            )
+        if isinstance(self.transactions, TransactionBatch):
+            batch = self.transactions
+        else:
+            batch = TransactionBatch.from_transactions(self.transactions)
+        return self._build(batch)
 
-            # Update Receiver Profile
-            if tx.receiver_id not in self.accounts:
-                self.accounts[tx.receiver_id] = AccountProfile(account_id=tx.receiver_id)
-            self.accounts[tx.receiver_id].update(
-                amount=tx.amount, 
-                is_sender=False, 
-                counterparty=tx.sender_id, 
-                timestamp=tx.timestamp
-            )
+    def add_chunk(self, batch: TransactionBatch):
+        """
+        Folds one chunk from DataLoader.iter_chunks into the builder. Only the compact
+        edge columns are kept; call finalize() after the last chunk.
+        """
+        lookup = self._account_index
+        remap = np.fromiter(
+            (lookup.setdefault(account_id, len(lookup)) for account_id in batch.account_ids.tolist()),
+            dtype=np.int64, count=len(batch.account_ids)
+        )
+        self._chunks.append(TransactionBatch(
+            transaction_ids=batch.transaction_ids,
+            sender=remap[batch.sender],
+            receiver=remap[batch.receiver],
+            amount=batch.amount,
+            timestamp=batch.timestamp,
+            account_ids=None,
+        ))
 
-            # Build Adjacency List (Directed)
-            if tx.sender_id not in self.adjacency_list:
-                self.adjacency_list[tx.sender_id] = []
-            
-            edge_data = {
-                "receiver": tx.receiver_id,
-                "amount": tx.amount,
-                "timestamp": tx.timestamp,
-                "transaction_id": tx_id
-            }
-            self.adjacency_list[tx.sender_id].append(edge_data)
+    def finalize(self):
+        """
+        Sorts the streamed edges by time and builds the graph, giving the same node and
+        edge order a whole-file load would.
+        """
+        account_ids = np.empty(len(self._account_index), dtype=object)
+        account_ids[:] = list(self._account_index)
+        batch = TransactionBatch.concatenate(self._chunks, account_ids)
+        rows = len(batch)
+        batch = batch.sorted_by_time()
+        if len(batch) < rows:
+            print(f"Dropped {rows - len(batch)} rows repeating an earlier transaction id.")
+        self._chunks = []
+        self._account_index = {}
+        return self._build(batch)
 
-            # Build Reverse Adjacency List (for Fan-In)
-            if tx.receiver_id not in self.reverse_adjacency_list:
-                self.reverse_adjacency_list[tx.receiver_id] = []
-            
-            reverse_edge_data = {
-                "sender": tx.sender_id,
-                "amount": tx.amount,
-                "timestamp": tx.timestamp,
-                "transaction_id": tx_id
-            }
-            self.reverse_adjacency_list[tx.receiver_id].append(reverse_edge_data)
+    def _build(self, batch: TransactionBatch):
+        self.graph = CsrGraph(batch)
+        self.adjacency_list = self.graph.adjacency_view()
+        self.reverse_adjacency_list = self.graph.reverse_adjacency_view()
 
-            if len(self.reverse_adjacency_list[tx.receiver_id]) > 1:
-                if (self.reverse_adjacency_list[tx.receiver_id][-1]["timestamp"] - self.reverse_adjacency_list[tx.receiver_id][-2]["timestamp"] > timedelta(minutes=2)):
-                    pass
+        # All account aggregates in one vectorized pass over the edge arrays
+        self.accounts = AccountStore(self.graph)
 
         print(f"Graph built with {len(self.accounts)} nodes.")
         return self.accounts, self.adjacency_list, self.reverse_adjacency_list
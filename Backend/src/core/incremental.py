@@ -0,0 +1,237 @@
+import os
+import pickle
+from typing import Dict, List, Tuple, Optional
+import numpy as np
+from src.models.transaction_batch import TransactionBatch
+from src.core.graph_builder import GraphBuilder
+from src.core.csr_graph import CsrGraph
+from src.clustering.network_builder import NetworkBuilder
+from src.patterns.merchant import MerchantDetector
+from src.patterns.payroll import PayrollDetector
+from src.patterns.loops import LoopDetector
+from src.patterns.dispersal import DispersalDetector, BurstChain
+from src.patterns.shells import ShellDetector
+from src.scoring.account_scorer import AccountScorer
+from src.scoring.risk_engine import RiskEngine
+
+class PipelineState:
+    """
+    What an incremental run keeps from the previous one: every transaction so far, the
+    merchant/payroll tags and final score of each account, and a ledger of the rings
+    found (loops, dispersal chains, shells) with each network's risk assessment.
+    """
+    FILE_NAME = "state.pkl"
+    VERSION = 1
+
+    def __init__(self):
+        self.batch: Optional[TransactionBatch] = None
+        self.account_ids = np.empty(0, dtype=object)
+        self.base_tags = np.zeros(0, dtype=np.uint64)
+        self.scores = np.zeros(0, dtype=np.float64)
+        self.loop_options: Optional[Tuple] = None
+        self.loops: List[List[str]] = []
+        self.chains: List[BurstChain] = []
+        self.shells: List[str] = []
+        # network key (see IncrementalPipeline._network_keys) -> RiskEngine output fields
+        self.network_risk: Dict[Tuple, Tuple] = {}
+
+    @classmethod
+    def load(cls, state_dir: str) -> "PipelineState":
+        path = os.path.join(state_dir, cls.FILE_NAME)
+        if not os.path.exists(path):
+            return cls()
+        try:
+            with open(path, "rb") as f:
+                state = pickle.load(f)
+        except Exception as e:
+            print(f"Error reading state {path}: {e}")
+            return cls()
+        if getattr(state, "version", None) != cls.VERSION:
+            print(f"Ignoring state {path} written by another version.")
+            return cls()
+        return state
+
+    def save(self, state_dir: str):
+        os.makedirs(state_dir, exist_ok=True)
+        self.version = self.VERSION
+        path = os.path.join(state_dir, self.FILE_NAME)
+        # Write then rename, so an interrupted run leaves the previous state intact
+        with open(path + ".tmp", "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + ".tmp", path)
+        print(f"Saved pipeline state to {path}")
+
+
+class IncrementalPipeline:
+    """
+    Runs detection on a new batch of transactions on top of a saved PipelineState.
+
+    The graph and account columns are rebuilt from all transactions (vectorized, cheap);
+    the detectors only re-run where the new edges can change their answer:
+      - merchant, payroll and shell checks for the accounts the new edges touch,
+      - loop search in the strongly connected components holding those accounts,
+      - dispersal BFS from hubs within CHAIN_LENGTH - 1 hops of them.
+    All other rings come from the ledger. Rings are then replayed in the order a full run
+    finds them, so ring ids and scores match a full run; accounts and networks outside the
+    affected region keep their previous scores and risk.
+    """
+
+    def __init__(self, state_dir: str, max_cycle_length: Optional[int] = None, time_window=None,
+                 temporal: bool = False, workers: int = 1):
+        self.state_dir = state_dir
+        self.loop_args = dict(max_cycle_length=max_cycle_length, time_window=time_window, temporal=temporal)
+        self.workers = workers
+
+    def run(self, batch: TransactionBatch):
+        state = PipelineState.load(self.state_dir)
+        first_run = state.batch is None
+        print(f"Incremental run: {len(batch)} new transactions on top of {0 if first_run else len(state.batch)}.")
+
+        gb = GraphBuilder()
+        print("Building graph and account profiles...")
+        if not first_run:
+            gb.add_chunk(state.batch)
+        gb.add_chunk(batch)
+        accounts, adj_list, rev_adj_list = gb.finalize()
+        graph = gb.graph
+        index = graph.index
+
+        old_nodes = np.fromiter((index[a] for a in state.account_ids.tolist()), dtype=np.int64, count=len(state.account_ids))
+        touched = np.unique(np.fromiter(
+            (index[a] for a in batch.account_ids[np.unique(np.concatenate((batch.sender, batch.receiver)))].tolist()),
+            dtype=np.int64,
+        ))
+        touched_set = set(touched.tolist())
+        print(f"{len(touched)} accounts touched by the new transactions.")
+
+        # 1. Merchant / payroll only change for touched accounts
+        accounts.tags[old_nodes] = state.base_tags
+        accounts.tags[touched] = 0
+        MerchantDetector(accounts, graph).detect(touched.tolist())
+        PayrollDetector(accounts, graph).detect(touched.tolist())
+        base_tags = accounts.tags.copy()
+
+        # 2. Loops: any new loop runs through a new edge, so only SCCs with touched accounts change
+        loop_detector = LoopDetector(accounts, graph, workers=self.workers, **self.loop_args)
+        loop_options = tuple(sorted(self.loop_args.items()))
+        rank = loop_detector.account_rank()
+        if first_run or state.loop_options != loop_options:
+            loop_detector.detect()
+            kept_loops, dropped_loops = [], state.loops
+        else:
+            components = loop_detector.components_touching(touched_set)
+            searched = set(node for component in components for node in component)
+            loop_detector.detect(components)
+            kept_loops = [m for m in state.loops if index[m[0]] not in searched]
+            dropped_loops = [m for m in state.loops if index[m[0]] in searched]
+        found_loops = [detail.members for detail in loop_detector.loops_detected.values()]
+        # Starts never repeat between kept and new loops, so a stable sort restores the full-run order
+        loops = sorted(kept_loops + found_loops, key=lambda members: rank[index[members[0]]])
+
+        # 3. Dispersal: a hub's BFS only changes if it expands a touched account
+        hops = DispersalDetector.CHAIN_LENGTH - 1
+        fan_out_hubs = self._within_hops(graph, touched, hops, outgoing=False)
+        fan_in_hubs = self._within_hops(graph, touched, hops, outgoing=True)
+        dispersal_detector = DispersalDetector(accounts, graph)
+        dispersal_detector.detect(fan_out_hubs, fan_in_hubs)
+        chain_dirty = lambda c: index[c.hub] in (fan_out_hubs if c.is_fan_out else fan_in_hubs)
+        kept_chains = [c for c in state.chains if not chain_dirty(c)]
+        dropped_chains = [c for c in state.chains if chain_dirty(c)]
+        chains = sorted(kept_chains + dispersal_detector.chains, key=lambda c: (index[c.hub], not c.is_fan_out))
+
+        # 4. Shells depend on the account's own totals only
+        shell_detector = ShellDetector(accounts, graph)
+        shell_detector.detect(touched.tolist())
+        dropped_shells = [a for a in state.shells if index[a] in touched_set]
+        shells = sorted([a for a in state.shells if index[a] not in touched_set] + shell_detector.shells, key=index.__getitem__)
+
+        # 5. Replay the merged ledger in full-run order: scores, tags, networks, ring ids
+        accounts.suspicious_score[:] = 0
+        accounts.tags[:] = base_tags
+        net_builder = NetworkBuilder(accounts, graph)
+        loop_replay = LoopDetector(accounts, graph, network_builder=net_builder)
+        for members in loops:
+            loop_replay.report_loop(members)
+        dispersal_replay = DispersalDetector(accounts, graph, network_builder=net_builder)
+        for chain in chains:
+            dispersal_replay.report_chain(chain)
+        shell_replay = ShellDetector(accounts, graph, network_builder=net_builder)
+        for account_id in shells:
+            shell_replay.report_shell(account_id)
+
+        # 6. Final scores: rescore accounts whose rings or totals changed, keep the rest
+        dirty = set(touched_set)
+        for members in dropped_loops + found_loops:
+            dirty.update(index[m] for m in members)
+        for chain in dropped_chains + dispersal_detector.chains:
+            dirty.update(index[m] for m in chain.members)
+        dirty.update(index[a] for a in dropped_shells + shell_detector.shells)
+        keep = np.zeros(graph.num_nodes, dtype=bool)
+        keep[old_nodes] = True
+        keep[list(dirty)] = False
+        previous = np.zeros(graph.num_nodes, dtype=np.float64)
+        previous[old_nodes] = state.scores
+        accounts.suspicious_score[keep] = previous[keep]
+        dirty_nodes = sorted(dirty)
+        AccountScorer(accounts).score_accounts(graph.account_ids[dirty_nodes].tolist())
+        print(f"Rescored {len(dirty_nodes)} of {len(accounts)} accounts.")
+
+        # 7. Network risk: re-evaluate networks with a rescored member, restore the rest
+        networks = net_builder.networks
+        keys = self._network_keys(loops, chains, shells)
+        dirty_ids = set(graph.account_ids[dirty_nodes].tolist())
+        stale = []
+        for network, key in zip(networks, keys):
+            if key in state.network_risk and dirty_ids.isdisjoint(network.members):
+                (network.risk_score, network.total_amount_moved, network.pattern_types_present,
+                 network.avg_suspicious_score, network.risk_level) = state.network_risk[key]
+            else:
+                stale.append(network)
+        RiskEngine(stale, accounts).evaluate_network_risk()
+
+        # 8. Persist for the next batch
+        state.batch = graph.batch
+        state.account_ids = graph.account_ids
+        state.base_tags = base_tags
+        state.scores = accounts.suspicious_score.copy()
+        state.loop_options = loop_options
+        state.loops = loops
+        state.chains = chains
+        state.shells = shells
+        state.network_risk = {
+            key: (n.risk_score, n.total_amount_moved, n.pattern_types_present, n.avg_suspicious_score, n.risk_level)
+            for n, key in zip(networks, keys)
+        }
+        state.save(self.state_dir)
+
+        return accounts, networks, loop_replay.loops_detected, adj_list, rev_adj_list
+
+    @staticmethod
+    def _network_keys(loops: List[List[str]], chains: List[BurstChain], shells: List[str]) -> List[Tuple]:
+        # Stable identities for the networks NetworkBuilder holds, in the same order
+        keys = [("loop", tuple(members)) for members in loops]
+        keys += [("dispersal", c.hub, c.is_fan_out) for c in chains if len(c.members) > 1]
+        keys += [("shell", account_id) for account_id in shells]
+        return keys
+
+    @staticmethod
+    def _within_hops(graph: CsrGraph, nodes: np.ndarray, hops: int, outgoing: bool) -> set:
+        """Nodes reachable from nodes in at most hops steps along out-edges (or in-edges)."""
+        if outgoing:
+            offsets, neighbors = graph.out_offsets, graph.out_neighbors
+        else:
+            offsets, neighbors = graph.in_offsets, graph.in_neighbors
+        reached = np.zeros(graph.num_nodes, dtype=bool)
+        reached[nodes] = True
+        frontier = nodes
+        for _ in range(hops):
+            starts = offsets[frontier]
+            counts = offsets[frontier + 1] - starts
+            total = int(counts.sum())
+            if total == 0:
+                break
+            positions = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)
+            frontier = np.unique(neighbors[positions])
+            frontier = frontier[~reached[frontier]]
+            reached[frontier] = True
+        return set(np.flatnonzero(reached).tolist())
@@ -1,6 +1,8 @@
 import sys
 import os
 import time
+import argparse
+from datetime import timedelta
 
 # Add local directory to path to allow imports if running directly
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -15,63 +17,115 @@ from src.clustering.network_builder import NetworkBuilder
 from src.scoring.account_scorer import AccountScorer
 from src.scoring.risk_engine import RiskEngine
 from src.utils.json_exporter import JsonExporter
+from src.core.incremental import IncrementalPipeline
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the GolMaal detection pipeline on a transactions CSV.")
+    parser.add_argument("input", nargs="?", default="transactions.csv", help="transactions CSV file")
+    parser.add_argument("download", nargs="?", default=None, help="download report path (defaults next to the input)")
+    parser.add_argument("--loader", choices=["columnar", "rows"], default="columnar",
+                        help="columnar parses straight into NumPy arrays; rows is the original per-row loader")
+    parser.add_argument("--stream", action="store_true",
+                        help="build the graph chunk by chunk instead of loading the whole file first")
+    parser.add_argument("--chunk-size", type=int, default=100000, help="rows per chunk in --stream mode")
+    parser.add_argument("--max-cycle-length", type=int, default=None,
+                        help="longest loop (in accounts) to report; unbounded by default")
+    parser.add_argument("--loop-window-hours", type=float, default=None,
+                        help="only report loops whose transfers all fall within this many hours of the first")
+    parser.add_argument("--temporal-loops", action="store_true",
+                        help="only report loops whose transfers happen in time order (window defaults to 72 hours)")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes for loop detection")
+    parser.add_argument("--state-dir", default=None,
+                        help="incremental mode: treat input as a new batch on top of the state kept in this directory")
+    return parser.parse_args(argv)
 
 
 def main():
-    
+    args = parse_args()
+
     # DONE file check
     if os.path.exists("DONE"):
         os.remove("DONE")
 
     start_time = time.time()
     
-    # Default file path
-    file_path = "transactions.csv"
-    
     # 1. Load CSV
-    if len(sys.argv) > 1:
-        file_path = sys.argv[1]
-    
+    file_path = args.input
+
     # Determine output directory based on input file location
     output_dir = os.path.dirname(file_path)
     outputfile = os.path.join(output_dir, "output.json")
     
     print(f"Starting pipeline with {file_path}")
     loader = DataLoader(file_path)
-    transactions = loader.load_transactions()
-    
-    if not transactions:
+    loop_window = timedelta(hours=args.loop_window_hours) if args.loop_window_hours is not None else None
+    if args.state_dir:
+        # Incremental: only the new batch is parsed; detection re-runs around the accounts it touches
+        batch = loader.load_columns()
+        if not batch:
+            print("No transactions loaded. Exiting.")
+            return -1
+        pipeline = IncrementalPipeline(args.state_dir, max_cycle_length=args.max_cycle_length, time_window=loop_window,
+                                       temporal=args.temporal_loops, workers=args.workers)
+        accounts, networks, loops, adj_list, rev_adj_list = pipeline.run(batch)
+        export_reports(args, accounts, networks, loops, adj_list, rev_adj_list, start_time, outputfile)
+        return
+
+    if args.stream:
+        # 1+2. Stream chunks straight into the graph; the full file is never held in memory
+        gb = GraphBuilder()
+        print("Building graph and account profiles...")
+        for chunk in loader.iter_chunks(args.chunk_size):
+            gb.add_chunk(chunk)
+        accounts, adj_list, rev_adj_list = gb.finalize()
+        graph = gb.graph
+    else:
+        if args.loader == "columnar":
+            transactions = loader.load_columns()
+        else:
+            transactions = loader.load_transactions()
+
+        if not transactions:
+            print("No transactions loaded. Exiting.")
+            return -1
+
+        # 2. Build Graph
+        gb = GraphBuilder(transactions)
+        accounts, adj_list, rev_adj_list = gb.build_graph()
+        graph = gb.graph
+        del transactions
+
+    if not accounts:
         print("No transactions loaded. Exiting.")
         return -1
 
-    # 2. Build Graph
-    gb = GraphBuilder(transactions)
-    accounts, adj_list, rev_adj_list = gb.build_graph()
-
-    net_builder = NetworkBuilder(accounts, adj_list)
+    net_builder = NetworkBuilder(accounts, graph)
 
     # 3. Detect Patterns 
     # Merchant (Before Loops/Scoring)
-    merchant_detector = MerchantDetector(accounts, adj_list, rev_adj_list)
+    merchant_detector = MerchantDetector(accounts, graph)
     merchant_detector.detect()
 
 
     # Payroll (Before Dispersal)
-    payroll_detector = PayrollDetector(accounts, adj_list)
+    payroll_detector = PayrollDetector(accounts, graph)
     payroll_detector.detect()
 
 
     # Loops
-    loop_detector = LoopDetector(accounts, adj_list, network_builder=net_builder)
+    loop_detector = LoopDetector(accounts, graph, network_builder=net_builder,
+                                 max_cycle_length=args.max_cycle_length, time_window=loop_window,
+                                 workers=args.workers, temporal=args.temporal_loops)
     loop_detector.detect()
     loops = loop_detector.loops_detected
 
     # Dispersal
-    dispersal_detector = DispersalDetector(accounts, adj_list, rev_adj_list, network_builder=net_builder)
+    dispersal_detector = DispersalDetector(accounts, graph, network_builder=net_builder)
     dispersal_detector.detect()
 
     # Shells
-    shell_detector = ShellDetector(accounts, adj_list, network_builder=net_builder)
+    shell_detector = ShellDetector(accounts, graph, network_builder=net_builder)
     shell_detector.detect()
 
     # 4. Score Accounts
@@ -88,6 +142,11 @@ def main():
     risk_engine.evaluate_network_risk()
 
     # 7. Export
+    export_reports(args, accounts, networks, loops, adj_list, rev_adj_list, start_time, outputfile)
+
+
+def export_reports(args, accounts, networks, loops, adj_list, rev_adj_list, start_time, outputfile):
+    output_dir = os.path.dirname(outputfile)
     JsonExporter.export(accounts, networks, outputfile)
     
     # 8. Download Report
@@ -97,8 +156,8 @@ def main():
     processing_time_str = f"{processing_time_seconds:.2f} seconds"
     
     download_file = os.path.join(output_dir, "download.json")
-    if len(sys.argv) > 2:
-        download_file = sys.argv[2]
+    if args.download:
+        download_file = args.download
         
     JsonExporter.export_download_report(accounts, networks, loops, processing_time_str, download_file, adj_list, rev_adj_list)
 
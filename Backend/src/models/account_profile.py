@@ -1,44 +1,102 @@
-from dataclasses import dataclass, field
 from typing import List, Set, Optional
 from datetime import datetime
+import numpy as np
 
-@dataclass
 class AccountProfile:
-    account_id: str
-    total_sent: float = 0.0
-    total_received: float = 0.0
-    unique_senders: Set[str] = field(default_factory=set)
-    unique_receivers: Set[str] = field(default_factory=set)
-    first_seen_time: Optional[datetime] = None
-    last_seen_time: Optional[datetime] = None
-    transaction_count: int = 0
-    suspicious_score: float = 0.0
-    tags: List[str] = field(default_factory=list)
-    network_id: Optional[str] = None
-    bursts: int = 0
-
-    def update(self, amount: float, is_sender: bool, counterparty: str, timestamp: datetime):
-        self.transaction_count += 1
-        
-        if self.first_seen_time is None or timestamp < self.first_seen_time:
-            self.first_seen_time = timestamp
-        if self.last_seen_time is None or timestamp > self.last_seen_time:
-            self.last_seen_time = timestamp
-
-        if is_sender:
-            self.total_sent += amount
-            self.unique_receivers.add(counterparty)
-        else:
-            self.total_received += amount
-            self.unique_senders.add(counterparty)
+    """
+    Lightweight view of one account's row in an AccountStore. Reads and writes go
+    straight to the store's columns, so profiles are cheap to create and throw away.
+    """
+    __slots__ = ("store", "index")
+
+    def __init__(self, store, index: int):
+        self.store = store
+        self.index = index
+
+    @property
+    def account_id(self) -> str:
+        return self.store.account_ids[self.index]
+
+    @property
+    def total_sent(self) -> float:
+        return float(self.store.total_sent[self.index])
+
+    @property
+    def total_received(self) -> float:
+        return float(self.store.total_received[self.index])
+
+    @property
+    def unique_senders(self) -> Set[str]:
+        return set(self.store.graph.counterparty_ids(self.index, outgoing=False))
+
+    @property
+    def unique_receivers(self) -> Set[str]:
+        return set(self.store.graph.counterparty_ids(self.index, outgoing=True))
+
+    @property
+    def unique_senders_count(self) -> int:
+        return int(self.store.unique_senders_count[self.index])
+
+    @property
+    def unique_receivers_count(self) -> int:
+        return int(self.store.unique_receivers_count[self.index])
+
+    @property
+    def first_seen_time(self) -> Optional[datetime]:
+        value = self.store.first_seen_time[self.index]
+        return None if np.isnat(value) else value.item()
+
+    @property
+    def last_seen_time(self) -> Optional[datetime]:
+        value = self.store.last_seen_time[self.index]
+        return None if np.isnat(value) else value.item()
+
+    @property
+    def transaction_count(self) -> int:
+        return int(self.store.transaction_count[self.index])
+
+    @property
+    def suspicious_score(self) -> float:
+        return float(self.store.suspicious_score[self.index])
+
+    @suspicious_score.setter
+    def suspicious_score(self, value: float):
+        self.store.suspicious_score[self.index] = value
+
+    @property
+    def tags(self) -> List[str]:
+        # A fresh list: use add_tag() to tag, or assign a whole list to replace
+        return self.store.tag_list(self.store.tags[self.index])
+
+    @tags.setter
+    def tags(self, value: List[str]):
+        self.store.tags[self.index] = self.store.tag_mask(value)
+
+    @property
+    def network_id(self) -> Optional[str]:
+        return self.store.network_id[self.index]
+
+    @network_id.setter
+    def network_id(self, value: Optional[str]):
+        self.store.network_id[self.index] = value
+
+    @property
+    def bursts(self) -> int:
+        return int(self.store.bursts[self.index])
+
+    def has_tag(self, tag: str) -> bool:
+        return bool(self.store.tags[self.index] & self.store.tag_bit(tag))
+
+    def add_tag(self, tag: str):
+        self.store.tags[self.index] |= self.store.tag_bit(tag)
 
     def to_dict(self):
         return {
             "account_id": self.account_id,
             "total_sent": self.total_sent,
             "total_received": self.total_received,
-            "unique_senders_count": len(self.unique_senders),
-            "unique_receivers_count": len(self.unique_receivers),
+            "unique_senders_count": self.unique_senders_count,
+            "unique_receivers_count": self.unique_receivers_count,
             "first_seen_time": self.first_seen_time.isoformat() if self.first_seen_time else None,
             "last_seen_time": self.last_seen_time.isoformat() if self.last_seen_time else None,
             "transaction_count": self.transaction_count,
@@ -47,6 +105,6 @@ class AccountProfile:
             "network_id": self.network_id
         }
     def IncSuspiciousScore(self, amount):
-        self.suspicious_score += amount
+        self.store.suspicious_score[self.index] += amount
     def UpdateBurstCount(self):
-        self.bursts += 1
\ No newline at end of file
+        self.store.bursts[self.index] += 1
@@ -0,0 +1,101 @@
+from collections.abc import Mapping
+from typing import List, Iterable
+import numpy as np
+from src.core.csr_graph import CsrGraph
+from src.models.account_profile import AccountProfile
+
+# Bit order doubles as the order AccountProfile.tags lists them in
+TAGS = (
+    "payroll",
+    "merchant",
+    "ringtype:loop",
+    "ringtype:dispersal_fan_out",
+    "ringtype:dispersal_fan_in",
+    "ringtype:shell",
+)
+
+class AccountStore(Mapping):
+    """
+    Struct-of-arrays account table: one NumPy column per AccountProfile field, indexed by
+    the graph's node id. Behaves like the old Dict[str, AccountProfile]; store[account_id]
+    (or store.at(node)) returns a lightweight AccountProfile view onto one row.
+    """
+
+    def __init__(self, graph: CsrGraph):
+        self.graph = graph
+        self.account_ids = graph.account_ids
+        self.tag_names: List[str] = list(TAGS)
+
+        n = graph.num_nodes
+        batch = graph.batch
+        sent_count = np.bincount(batch.sender, minlength=n)
+        received_count = np.bincount(batch.receiver, minlength=n)
+
+        self.total_sent = np.bincount(batch.sender, weights=batch.amount, minlength=n)
+        self.total_received = np.bincount(batch.receiver, weights=batch.amount, minlength=n)
+        self.transaction_count = sent_count + received_count
+        self.unique_senders_count = np.diff(graph.counterparty_offsets(outgoing=False))
+        self.unique_receivers_count = np.diff(graph.counterparty_offsets(outgoing=True))
+
+        # Edge slices are time sorted, so first/last seen are the slice ends
+        self.first_seen_time = np.fmin(
+            self._slice_ends(graph.out_offsets[:-1], graph.out_timestamps, sent_count > 0),
+            self._slice_ends(graph.in_offsets[:-1], graph.in_timestamps, received_count > 0),
+        )
+        self.last_seen_time = np.fmax(
+            self._slice_ends(graph.out_offsets[1:] - 1, graph.out_timestamps, sent_count > 0),
+            self._slice_ends(graph.in_offsets[1:] - 1, graph.in_timestamps, received_count > 0),
+        )
+
+        self.suspicious_score = np.zeros(n, dtype=np.float64)
+        self.tags = np.zeros(n, dtype=np.uint64)
+        self.network_id = np.full(n, None, dtype=object)
+        self.bursts = np.zeros(n, dtype=np.int64)
+
+    @staticmethod
+    def _slice_ends(positions: np.ndarray, timestamps: np.ndarray, has_edges: np.ndarray) -> np.ndarray:
+        result = np.full(len(positions), np.datetime64("NaT"), dtype="datetime64[s]")
+        result[has_edges] = timestamps[positions[has_edges]]
+        return result
+
+    def tag_bit(self, tag: str) -> np.uint64:
+        if tag not in self.tag_names:
+            if len(self.tag_names) >= 64:
+                raise ValueError(f"Too many distinct tags to register {tag!r}")
+            self.tag_names.append(tag)
+        return np.uint64(1 << self.tag_names.index(tag))
+
+    def tag_mask(self, tags: Iterable[str]) -> np.uint64:
+        mask = np.uint64(0)
+        for tag in tags:
+            mask |= self.tag_bit(tag)
+        return mask
+
+    def tag_list(self, mask) -> List[str]:
+        mask = int(mask)
+        return [tag for bit, tag in enumerate(self.tag_names) if mask >> bit & 1]
+
+    def has_tag(self, tag: str) -> np.ndarray:
+        """Boolean column: which accounts carry tag."""
+        return (self.tags & self.tag_bit(tag)) != 0
+
+    def at(self, node: int) -> AccountProfile:
+        return AccountProfile(self, node)
+
+    def __getitem__(self, account_id: str) -> AccountProfile:
+        return AccountProfile(self, self.graph.index[account_id])
+
+    def __contains__(self, account_id) -> bool:
+        return account_id in self.graph.index
+
+    def __iter__(self):
+        return iter(self.account_ids.tolist())
+
+    def __len__(self):
+        return len(self.account_ids)
+
+    def values(self):
+        return (AccountProfile(self, node) for node in range(len(self.account_ids)))
+
+    def items(self):
+        return ((account_id, AccountProfile(self, node)) for node, account_id in enumerate(self.account_ids.tolist()))
@@ -0,0 +1,109 @@
+from dataclasses import dataclass
+from typing import Dict, List
+import numpy as np
+from src.models.transaction import Transaction
+
+@dataclass
+class TransactionBatch:
+    """
+    Columnar view of a set of transactions.
+    sender / receiver are integer codes into account_ids (dictionary encoding).
+    """
+    transaction_ids: np.ndarray
+    sender: np.ndarray
+    receiver: np.ndarray
+    amount: np.ndarray
+    timestamp: np.ndarray
+    account_ids: np.ndarray
+
+    def __len__(self):
+        return len(self.amount)
+
+    @classmethod
+    def empty(cls):
+        return cls(
+            transaction_ids=np.empty(0, dtype=str),
+            sender=np.empty(0, dtype=np.int64),
+            receiver=np.empty(0, dtype=np.int64),
+            amount=np.empty(0, dtype=np.float64),
+            timestamp=np.empty(0, dtype="datetime64[s]"),
+            account_ids=np.empty(0, dtype=object),
+        )
+
+    @classmethod
+    def from_transactions(cls, transactions: Dict[str, Transaction]):
+        """Encodes a load_transactions() dict, keeping its order."""
+        lookup: Dict[str, int] = {}
+        sender = np.empty(len(transactions), dtype=np.int64)
+        receiver = np.empty(len(transactions), dtype=np.int64)
+        for i, tx in enumerate(transactions.values()):
+            sender[i] = lookup.setdefault(tx.sender_id, len(lookup))
+            receiver[i] = lookup.setdefault(tx.receiver_id, len(lookup))
+
+        account_ids = np.empty(len(lookup), dtype=object)
+        account_ids[:] = list(lookup)
+        return cls(
+            transaction_ids=np.array(list(transactions.keys()), dtype=str),
+            sender=sender,
+            receiver=receiver,
+            amount=np.array([tx.amount for tx in transactions.values()], dtype=np.float64),
+            timestamp=np.array([tx.timestamp for tx in transactions.values()], dtype="datetime64[s]"),
+            account_ids=account_ids,
+        )
+
+    @classmethod
+    def concatenate(cls, batches: List["TransactionBatch"], account_ids: np.ndarray):
+        """Joins batches whose codes already index into the shared account_ids table."""
+        if not batches:
+            empty = cls.empty()
+            empty.account_ids = account_ids
+            return empty
+        return cls(
+            transaction_ids=np.concatenate([b.transaction_ids for b in batches]),
+            sender=np.concatenate([b.sender for b in batches]),
+            receiver=np.concatenate([b.receiver for b in batches]),
+            amount=np.concatenate([b.amount for b in batches]),
+            timestamp=np.concatenate([b.timestamp for b in batches]),
+            account_ids=account_ids,
+        )
+
+    def sorted_by_time(self):
+        """
+        Stable sort by timestamp, keeping one row per transaction id, then renumber accounts
+        in order of first appearance (sender before receiver) so ids line up with the
+        row-based GraphBuilder. Duplicate ids are resolved as load_transactions' dict does:
+        the id keeps its first position in time order and takes the values of its last row.
+        """
+        order = np.argsort(self.timestamp, kind="stable")
+        order = order[self._distinct_rows(self.transaction_ids[order])]
+        sender = self.sender[order]
+        receiver = self.receiver[order]
+
+        pairs = np.empty(2 * len(order), dtype=np.int64)
+        pairs[0::2] = sender
+        pairs[1::2] = receiver
+        codes, first_index = np.unique(pairs, return_index=True)
+        appearance = codes[np.argsort(first_index, kind="stable")]
+
+        remap = np.full(len(self.account_ids), -1, dtype=np.int64)
+        remap[appearance] = np.arange(len(appearance), dtype=np.int64)
+
+        return TransactionBatch(
+            transaction_ids=self.transaction_ids[order],
+            sender=remap[sender],
+            receiver=remap[receiver],
+            amount=self.amount[order],
+            timestamp=self.timestamp[order],
+            account_ids=self.account_ids[appearance],
+        )
+
+    @staticmethod
+    def _distinct_rows(transaction_ids: np.ndarray) -> np.ndarray:
+        """Row positions with one row per id: the last row of each id, placed at the id's first position."""
+        unique, first = np.unique(transaction_ids, return_index=True)
+        if len(unique) == len(transaction_ids):
+            return np.arange(len(transaction_ids))
+        # Both unique() calls list the ids in the same (sorted) order
+        _, last_reversed = np.unique(transaction_ids[::-1], return_index=True)
+        last = len(transaction_ids) - 1 - last_reversed
+        return last[np.argsort(first, kind="stable")]
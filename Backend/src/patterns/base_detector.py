@@ -1,12 +1,27 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any
+from typing import Dict, Iterable, Iterator
 from src.models.account_profile import AccountProfile
+from src.core.csr_graph import CsrGraph, AdjacencyView
 
 class BasePatternDetector(ABC):
-    def __init__(self, accounts: Dict[str, AccountProfile], adjacency_list: Dict[str, List[Dict[str, Any]]], reverse_adjacency_list: Dict[str, List[Dict[str, Any]]] = None):
+    def __init__(self, accounts: Dict[str, AccountProfile], graph: CsrGraph):
         self.accounts = accounts
-        self.adjacency_list = adjacency_list
-        self.reverse_adjacency_list = reverse_adjacency_list or {}
+        self.graph = graph
+
+    @property
+    def adjacency_list(self) -> AdjacencyView:
+        # Compatibility view for detectors still written against the dict-of-lists graph
+        return self.graph.adjacency_view()
+
+    @property
+    def reverse_adjacency_list(self) -> AdjacencyView:
+        return self.graph.reverse_adjacency_view()
+
+    def _profiles(self, nodes: Iterable[int] = None) -> Iterator[AccountProfile]:
+        # Every account, or only the given node ids (incremental runs)
+        if nodes is None:
+            return iter(self.accounts.values())
+        return (self.accounts.at(node) for node in nodes)
 
     @abstractmethod
     def detect(self):
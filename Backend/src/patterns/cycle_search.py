@@ -0,0 +1,271 @@
+import heapq
+import multiprocessing as mp
+from collections import defaultdict
+from typing import Dict, List, Tuple, Iterable, Iterator, Optional, Set
+import numpy as np
+from src.core.csr_graph import CsrGraph
+
+# node -> (neighbors, edge timestamps in epoch seconds), both in edge (time) order
+Adjacency = Dict[int, Tuple[List[int], List[int]]]
+
+class CycleSearch:
+    """
+    Johnson-style simple cycle enumeration over a CsrGraph.
+
+    Cycles are reported once, from their lowest-ranked node, in the same order a plain
+    DFS over nodes sorted by rank would find them; parallel edges count as distinct
+    cycles. Each search is confined to the strongly connected component holding its
+    start node, uses an explicit stack, and blocks nodes with the bounded-length variant
+    of Johnson's blocked sets (Gupta & Suzumura), so a max_length stays exact.
+
+    time_window (seconds), when set, keeps only cycles whose edges all fall within
+    [t0, t0 + time_window], t0 being the time of the edge leaving the start node.
+    """
+
+    MIN_LENGTH = 3
+    # Start-rank ranges handed out per pool worker, so uneven components even out
+    TASKS_PER_WORKER = 4
+
+    def __init__(self, graph: CsrGraph, rank: np.ndarray, skip_start: np.ndarray = None,
+                 max_length: Optional[int] = None, time_window: Optional[int] = None):
+        self.graph = graph
+        self.rank = rank
+        self.skip_start = skip_start if skip_start is not None else np.zeros(graph.num_nodes, dtype=bool)
+        self.max_length = max_length
+        self.time_window = time_window
+        self._timestamps = graph.out_timestamps.astype(np.int64)
+
+    def components(self, nodes: Iterable[int] = None) -> List[List[int]]:
+        """Strongly connected components (of at least MIN_LENGTH nodes) of the whole graph or a node subset."""
+        if nodes is None:
+            offsets, neighbors = self.graph.out_offsets, self.graph.out_neighbors
+            members = None
+            node_list = range(self.graph.num_nodes)
+            successors = lambda v: neighbors[offsets[v]:offsets[v + 1]].tolist()
+        else:
+            node_list = list(nodes)
+            members = set(node_list)
+            adjacency = self.adjacency(node_list)
+            successors = lambda v: adjacency[v][0]
+        return [c for c in strongly_connected_components(node_list, successors, members) if len(c) >= self.MIN_LENGTH]
+
+    def adjacency(self, nodes: Iterable[int]) -> Adjacency:
+        """Out-edges of nodes restricted to the same node set."""
+        members = set(nodes)
+        offsets, neighbors, timestamps = self.graph.out_offsets, self.graph.out_neighbors, self._timestamps
+        adjacency: Adjacency = {}
+        for v in members:
+            start, end = offsets[v], offsets[v + 1]
+            kept = [(w, t) for w, t in zip(neighbors[start:end].tolist(), timestamps[start:end].tolist()) if w in members]
+            adjacency[v] = ([w for w, _ in kept], [t for _, t in kept])
+        return adjacency
+
+    def cycles(self, components: List[List[int]] = None) -> Iterator[Tuple[int, List[int]]]:
+        """All cycles of the graph (or of the given components) as (start, path), starts in increasing rank."""
+        heap = []
+        for component in components if components is not None else self.components():
+            self._push(heap, component)
+        return self._drain(heap)
+
+    def cycles_in_component(self, component: List[int]) -> Iterator[Tuple[int, List[int]]]:
+        """Cycles of one strongly connected component, starts in increasing rank."""
+        return self.cycles_in_range(component, 0, len(self.rank))
+
+    def cycles_in_range(self, component: List[int], low: int, high: int) -> Iterator[Tuple[int, List[int]]]:
+        """Cycles of component whose start (lowest-ranked node) has a rank in [low, high]."""
+        heap = []
+        for sub in self.components([v for v in component if self.rank[v] >= low]):
+            self._push(heap, sub)
+        return self._drain(heap, high)
+
+    def cycles_parallel(self, workers: int, components: List[List[int]] = None) -> List[Tuple[int, List[int]]]:
+        """
+        Same cycles, in the same order, as cycles(), with the search spread over a process
+        pool. Components are split into start-rank ranges; workers are forked with this
+        search object already in memory, so a task is just (component, low, high).
+        """
+        if "fork" not in mp.get_all_start_methods():
+            print("Process pool needs the fork start method; searching loops serially.")
+            return list(self.cycles(components))
+
+        if components is None:
+            components = self.components()
+        tasks = self._range_tasks(components, workers)
+        found: List[Tuple[int, List[int]]] = []
+        if tasks:
+            context = mp.get_context("fork")
+            with context.Pool(workers, initializer=_init_worker, initargs=(self, components)) as pool:
+                for result in pool.imap_unordered(_search_range, tasks):
+                    found.extend(result)
+
+        # Each start belongs to exactly one task and keeps its own path order, so a stable
+        # sort by start rank restores the serial order
+        found.sort(key=lambda item: self.rank[item[0]])
+        return found
+
+    def _range_tasks(self, components: List[List[int]], workers: int) -> List[Tuple[int, int, int]]:
+        total = sum(len(c) for c in components)
+        target = workers * self.TASKS_PER_WORKER
+        tasks = []
+        for i, component in enumerate(components):
+            ranks = sorted(self.rank[v] for v in component)
+            pieces = min(len(ranks), max(1, round(target * len(ranks) / total)))
+            step = -(-len(ranks) // pieces)
+            for first in range(0, len(ranks), step):
+                last = min(first + step, len(ranks)) - 1
+                tasks.append((i, int(ranks[first]), int(ranks[last])))
+        return tasks
+
+    def _push(self, heap, component: List[int]):
+        start = min(component, key=self.rank.__getitem__)
+        heapq.heappush(heap, (self.rank[start], start, component))
+
+    def _drain(self, heap, high: Optional[int] = None) -> Iterator[Tuple[int, List[int]]]:
+        while heap and (high is None or heap[0][0] <= high):
+            _, start, component = heapq.heappop(heap)
+            yield from self._cycles_from_component(heap, start, component)
+
+    def _cycles_from_component(self, heap, start: int, component: List[int]):
+        if not self.skip_start[start]:
+            for path in self.search(start, component):
+                yield start, path
+        rest = [v for v in component if v != start]
+        for sub in self.components(rest):
+            self._push(heap, sub)
+
+    def search(self, start: int, component: List[int], adjacency: Adjacency = None) -> List[List[int]]:
+        if adjacency is None:
+            adjacency = self.adjacency(component)
+        bound = self.max_length if self.max_length is not None else len(component)
+        if self.time_window is None:
+            return self._bounded_search(start, adjacency, bound, 0, len(adjacency[start][0]), None, None)
+
+        found = []
+        neighbors, times = adjacency[start]
+        for first in range(len(neighbors)):
+            t0 = times[first]
+            found.extend(self._bounded_search(start, adjacency, bound, first, first + 1, t0, t0 + self.time_window))
+        return found
+
+    def _bounded_search(self, start: int, adjacency: Adjacency, bound: int,
+                        edge_start: int, edge_end: int, t_min: Optional[int], t_max: Optional[int]) -> List[List[int]]:
+        found = []
+        path = [start]
+        lock: Dict[int, int] = {start: 0}
+        blocked_by: Dict[int, Set[int]] = defaultdict(set)
+        # Each frame is [node, next edge position, end edge position]
+        stack = [[start, edge_start, edge_end]]
+        closing = [bound]
+
+        while stack:
+            frame = stack[-1]
+            v, position, end = frame
+            neighbors, times = adjacency[v]
+            descended = False
+            while position < end:
+                w = neighbors[position]
+                t = times[position]
+                position += 1
+                if t_min is not None and (t < t_min or t > t_max):
+                    continue
+                if w == start:
+                    if len(path) >= self.MIN_LENGTH:
+                        found.append(list(path))
+                    closing[-1] = 1
+                elif len(path) < lock.get(w, bound):
+                    frame[1] = position
+                    lock[w] = len(path)
+                    path.append(w)
+                    closing.append(bound)
+                    stack.append([w, 0, len(adjacency[w][0])])
+                    descended = True
+                    break
+            if descended:
+                continue
+
+            # All edges of v explored: unwind and unblock
+            stack.pop()
+            v = path.pop()
+            distance = closing.pop()
+            if closing:
+                closing[-1] = min(closing[-1], distance + 1)
+            if distance < bound:
+                relax = [(distance, v)]
+                on_path = set(path)
+                while relax:
+                    distance, u = relax.pop()
+                    if lock.get(u, bound) < bound - distance + 1:
+                        lock[u] = bound - distance + 1
+                        relax.extend((distance + 1, x) for x in blocked_by[u] if x not in on_path)
+            else:
+                neighbors, times = adjacency[v]
+                for w, t in zip(neighbors, times):
+                    if t_min is None or t_min <= t <= t_max:
+                        blocked_by[w].add(v)
+        return found
+
+
+def strongly_connected_components(nodes: Iterable[int], successors, members: Optional[Set[int]] = None) -> List[List[int]]:
+    """Iterative Tarjan. successors(v) lists v's out-neighbors; members, if given, restricts the graph."""
+    index: Dict[int, int] = {}
+    low: Dict[int, int] = {}
+    on_stack: Set[int] = set()
+    stack: List[int] = []
+    result: List[List[int]] = []
+    counter = 0
+
+    for root in nodes:
+        if root in index:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(successors(root)))]
+        while work:
+            v, remaining = work[-1]
+            descended = False
+            for w in remaining:
+                if members is not None and w not in members:
+                    continue
+                if w not in index:
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack.add(w)
+                    work.append((w, iter(successors(w))))
+                    descended = True
+                    break
+                if w in on_stack and index[w] < low[v]:
+                    low[v] = index[w]
+            if descended:
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                if low[v] < low[parent]:
+                    low[parent] = low[v]
+            if low[v] == index[v]:
+                component = []
+                while True:
+                    w = stack.pop()
+                    on_stack.discard(w)
+                    component.append(w)
+                    if w == v:
+                        break
+                result.append(component)
+    return result
+
+
+# Worker state for CycleSearch.cycles_parallel, inherited through fork
+_worker_search: Optional[CycleSearch] = None
+_worker_components: List[List[int]] = []
+
+def _init_worker(search: CycleSearch, components: List[List[int]]):
+    global _worker_search, _worker_components
+    _worker_search = search
+    _worker_components = components
+
+def _search_range(task: Tuple[int, int, int]) -> List[Tuple[int, List[int]]]:
+    index, low, high = task
+    return list(_worker_search.cycles_in_range(_worker_components[index], low, high))
@@ -1,8 +1,20 @@
+from collections import deque
 from datetime import timedelta
+import numpy as np
 from src.patterns.base_detector import BasePatternDetector
 from src.clustering.network_builder import NetworkBuilder
 from src.models.ring_detail import RingDetail
-from typing import Dict, Any
+from src.core.csr_graph import CsrGraph
+from typing import Dict, Any, List, Tuple, Set
+from dataclasses import dataclass
+
+@dataclass
+class BurstChain:
+    """What one burst BFS found: visit order, and the (account, depth) of each node with burst edges."""
+    hub: str
+    is_fan_out: bool
+    members: List[str]
+    bursting: List[Tuple[str, int]]
 
 class DispersalDetector(BasePatternDetector):
     # Tunable parameters
@@ -11,98 +23,94 @@ class DispersalDetector(BasePatternDetector):
     TIME_LIMIT = timedelta(hours=1)
     BASE_SUSPICION = 70.0
 
-    def __init__(self, accounts: Dict[str, Any], adjacency_list: Dict[str, Any], reverse_adjacency_list: Dict[str, Any], network_builder: NetworkBuilder = None):
-        super().__init__(accounts, adjacency_list, reverse_adjacency_list)
+    def __init__(self, accounts: Dict[str, Any], graph: CsrGraph, network_builder: NetworkBuilder = None):
+        super().__init__(accounts, graph)
         self.network_builder = network_builder
+        self.chains: List[BurstChain] = []
 
-    def detect(self):
+    def detect(self, fan_out_nodes: Set[int] = None, fan_in_nodes: Set[int] = None):
+        """
+        fan_out_nodes / fan_in_nodes, when given, limit which accounts are tried as hubs in
+        each direction; otherwise every account is.
+        """
         print("Detecting dispersal patterns (Fan-Out/Fan-In) with Burst BFS...")
-        self._detect_fan()
+        self._detect_fan(fan_out_nodes, fan_in_nodes)
+
+    def _detect_fan(self, fan_out_nodes: Set[int] = None, fan_in_nodes: Set[int] = None):
+        if fan_out_nodes is None and fan_in_nodes is None:
+            profiles = self.accounts.values()
+        else:
+            fan_out_nodes, fan_in_nodes = fan_out_nodes or set(), fan_in_nodes or set()
+            profiles = (self.accounts.at(node) for node in sorted(fan_out_nodes | fan_in_nodes))
 
-    def _detect_fan(self):
         # Fan-Out: One sender -> Many receivers
         # Use adj_list, look for Unique Receivers > Threshold
-        for account_id, profile in self.accounts.items():
-            if "payroll" in profile.tags or "merchant" in profile.tags:
+        for profile in profiles:
+            if profile.has_tag("payroll") or profile.has_tag("merchant"):
                 continue
-            if len(profile.unique_receivers) > self.UNIQUE_THRESHOLD:
-                self._bfs_burst(account_id, self.adjacency_list, "ringtype:dispersal_fan_out", is_fan_out=True)
-            if len(profile.unique_senders) > self.UNIQUE_THRESHOLD:
-                self._bfs_burst(account_id, self.reverse_adjacency_list, "ringtype:dispersal_fan_in", is_fan_out=False)
+            node = profile.index
+            if profile.unique_receivers_count > self.UNIQUE_THRESHOLD and (fan_out_nodes is None or node in fan_out_nodes):
+                self._bfs_burst(node, is_fan_out=True)
+            if profile.unique_senders_count > self.UNIQUE_THRESHOLD and (fan_in_nodes is None or node in fan_in_nodes):
+                self._bfs_burst(node, is_fan_out=False)
+
 
+    def _bfs_burst(self, start_node: int, is_fan_out: bool):
+        account_ids = self.graph.account_ids
+        # Burst edges are worked out once per direction for the whole graph and shared
+        # by every traversal, instead of rescanning a hub's edges on each visit
+        has_burst, burst_offsets, burst_neighbors = self.graph.burst_index(is_fan_out, np.timedelta64(self.TIME_LIMIT))
 
-    def _bfs_burst(self, start_node: str, adj: dict, tag_name: str, is_fan_out: bool):
         # BFS State: (current_node, depth)
-        queue = [(start_node, 0)]
-        visited_in_sequence = set()
-        visited_in_sequence.add(start_node)
-        self.accounts[start_node].IncSuspiciousScore(100)
+        queue = deque([(start_node, 0)])
+        visited_in_sequence = [start_node]
+        visited = {start_node}
+        bursting = []
         
         while queue:
-            curr, depth = queue.pop(0)
+            curr, depth = queue.popleft()
             
             if depth >= self.CHAIN_LENGTH:
                 break
 
-            if curr not in adj:
+            # A burst is a sequence of txs close in time (consecutive gaps <= TIME_LIMIT).
+            # If no bursts found at this node, chain stops here for this path
+            if not has_burst[curr]:
                 continue
-
-            # 1. Identify Burst Edges from current node
-            edges = adj[curr]
-            # Ensure chronological order for burst check
-            edges.sort(key=lambda x: x['timestamp'])
-
-            burst_neighbors = set()
-            
-            # Check consecutive transactions for TIMELIMIT constraint
-            # A burst is a sequence of txs close in time.
-            # Any tx involved in a burst is valid for traversal.
-            
-            # We need to look at windows. 
-            # If t2-t1 <= Limit, both t1 and t2 are in burst.
-            
-            # Optimization: boolean array or set of indices
-            in_burst = [False] * len(edges)
-            
-            for i in range(1, len(edges)):
-                t_prev = edges[i-1]['timestamp']
-                t_curr = edges[i]['timestamp']
                 
-                if t_curr - t_prev <= self.TIME_LIMIT:
-                    in_burst[i-1] = True
-                    in_burst[i] = True
+            # This node is part of the burst chain; scored by depth below
+            bursting.append((curr, depth))
             
+            # Collect neighbors for next level BFS
+            for neighbor in burst_neighbors[burst_offsets[curr]:burst_offsets[curr + 1]].tolist():
+                if neighbor not in visited:
+                    visited.add(neighbor)
+                    visited_in_sequence.append(neighbor)
+                    queue.append((neighbor, depth + 1))
 
+        self.report_chain(BurstChain(
+            hub=account_ids[start_node],
+            is_fan_out=is_fan_out,
+            members=account_ids[visited_in_sequence].tolist(),
+            bursting=[(account_ids[node], depth) for node, depth in bursting],
+        ))
 
-            # If no bursts found at this node, chain stops here for this path
-            if not any(in_burst):
-                continue
-                
+    def report_chain(self, chain: BurstChain):
+        """Scores, tags and records one burst BFS; also used to replay stored chains."""
+        self.chains.append(chain)
+        tag_name = "ringtype:dispersal_fan_out" if chain.is_fan_out else "ringtype:dispersal_fan_in"
+        self.accounts[chain.hub].IncSuspiciousScore(100)
+        for account_id, depth in chain.bursting:
             # Score this node for being part of a burst chain
             # Diminishing score based on depth
             score_boost = self.BASE_SUSPICION / (depth + 1)
-            self.accounts[curr].IncSuspiciousScore(score_boost)
-            
-            if tag_name not in self.accounts[curr].tags:
-                self.accounts[curr].tags.append(tag_name)
-            
-            # Collect neighbors for next level BFS
-            neighbor_key = 'receiver' if is_fan_out else 'sender'
-            
-            for i, is_active in enumerate(in_burst):
-                if is_active:
-                    neighbor = edges[i][neighbor_key]
-                    if neighbor not in visited_in_sequence:
-                        visited_in_sequence.add(neighbor)
-                        queue.append((neighbor, depth + 1))
-                        burst_neighbors.add(neighbor)
-
-            # Optimization: If fan-out/in is huge, queue might get large. 
-            # visited_in_sequence prevents cycles and redundant work.
+            profile = self.accounts[account_id]
+            profile.IncSuspiciousScore(score_boost)
+            profile.add_tag(tag_name)
 
-        if self.network_builder and len(visited_in_sequence) > 1:
-            members = list(visited_in_sequence)
-            ring_id = f"DISPERSAL_{start_node}"
+        if self.network_builder and len(chain.members) > 1:
+            members = chain.members
+            ring_id = f"DISPERSAL_{chain.hub}"
             # Simple structure: all members in one group for now as specific depth tracking requires refactor
             nodes_by_distance = [members] 
             
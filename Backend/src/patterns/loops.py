@@ -1,102 +1,84 @@
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Iterable
+import numpy as np
 from src.patterns.base_detector import BasePatternDetector
+from src.patterns.cycle_search import CycleSearch
+from src.patterns.temporal_cycles import TemporalCycleSearch
 from src.models.ring_detail import RingDetail
 from src.clustering.network_builder import NetworkBuilder
-from datetime import datetime
+from src.core.csr_graph import CsrGraph
+from datetime import timedelta
 
 class LoopDetector(BasePatternDetector):
     cycle_length = 0
+    # Window used by temporal mode when no time_window is given
+    TEMPORAL_WINDOW = timedelta(hours=72)
 
-    def __init__(self, accounts: Dict[str, Any], adjacency_list: Dict[str, Any], network_builder: NetworkBuilder = None):
-        super().__init__(accounts, adjacency_list)
+    def __init__(self, accounts: Dict[str, Any], graph: CsrGraph, network_builder: NetworkBuilder = None,
+                 max_cycle_length: Optional[int] = None, time_window: Optional[timedelta] = None, workers: int = 1,
+                 temporal: bool = False):
+        super().__init__(accounts, graph)
         self.network_builder = network_builder
+        self.max_cycle_length = max_cycle_length
+        self.time_window = time_window
+        self.workers = workers
+        # Temporal mode: transfers along a loop must happen in time order, within the window
+        self.temporal = temporal
         self.loops_detected: Dict[str, RingDetail] = {}
-
-    def detect(self):
-        print("Detecting loops (cycles) using modified Johnson's algorithm...")
-        
         self.loop_counter = 0
+        self._rank = None
 
-        # Create a sorted list of nodes to iterate through
-        # Sorting helps in deterministic execution and allows skipping nodes < start_node
-        nodes = sorted(list(self.accounts.keys()))
+    def detect(self, components: List[List[int]] = None):
+        """
+        components, when given, limits the search to those strongly connected components
+        (see components_touching); loops elsewhere are left alone.
+        """
+        if self.temporal:
+            print("Detecting time-respecting loops (temporal cycles)...")
+        else:
+            print("Detecting loops (cycles) using Johnson's algorithm...")
         
-        for start_node in nodes:
-            self.cycle_length = 0
-            if "payroll" in self.accounts[start_node].tags or "merchant" in self.accounts[start_node].tags:
-                continue    
-            else:
-                self._circuit(start_node, start_node, [], datetime.min)
+        self.loop_counter = 0
+        search = self._cycle_search()
+        # Cycles come back in serial order either way, so ring ids match a single-process run
+        cycles = search.cycles_parallel(self.workers, components) if self.workers > 1 else search.cycles(components)
+        for _, path in cycles:
+            self._record_loop(path)
 
         print(f"Total loops detected: {len(self.loops_detected)}")
 
-    def _circuit(self, start_node: str, current_node: str, stack: List[Tuple[str, datetime]], min_timestamp: datetime):
-        """
-        Recursive function to find circuits starting from start_node.
-        Subject to constraints:
-        1. Nodes in path must be >= start_node (avoids duplicates).
-        2. Edges must have timestamp > min_timestamp (temporal constraint).
-        """
-        
-        # Add current node to stack with the timestamp of the edge that led to it
-        # For the start node, we can use a dummy timestamp or handle it separately.
-        # Here stack stores (node_id, arrival_time)
-        
-        # If stack is empty, it's the start node
-        arrival_time = min_timestamp
-        if stack:
-            arrival_time = stack[-1][1]
+    def components_touching(self, nodes: Iterable[int]) -> List[List[int]]:
+        """The strongly connected components holding any of nodes: every loop through them lies in one."""
+        nodes = set(nodes)
+        return [c for c in self._cycle_search().components() if not nodes.isdisjoint(c)]
 
-        # Optimization: Don't revisit nodes already in current stack (simple cycle check)
-        # Johnson's usually uses blocked set, but for simple DFS with constraints this works for now.
-        if any(node == current_node for node, _ in stack):
-            return
+    def account_rank(self) -> np.ndarray:
+        # Cycles are reported from their smallest account id (canonical ordering avoids
+        # duplicates), temporal ones from their earliest edge; either way starts are
+        # visited in account id order, which rank[] carries for the integer node ids
+        if self._rank is None:
+            nodes = np.argsort(self.graph.account_ids, kind="stable")
+            self._rank = np.empty(self.graph.num_nodes, dtype=np.int64)
+            self._rank[nodes] = np.arange(len(nodes))
+        return self._rank
 
-        stack.append((current_node, arrival_time))
-        
-        if current_node in self.adjacency_list:
-            for edge in self.adjacency_list[current_node]:
-                neighbor = edge['receiver']
-                edge_timestamp = edge['timestamp']
-                
-                # Constraint 1: Canonical ordering to avoid duplicates
-                if neighbor < start_node:
-                    continue
-                
-                # Constraint 2: Temporal constraint
-                # Only follow edges that occurred AFTER the edge that started this path segment
-                # For the first edge (from start_node), min_timestamp is datetime.min, so any edge works.
-                # if edge_timestamp <= min_timestamp and len(stack) > 1:
-                #      continue
+    def _cycle_search(self) -> CycleSearch:
+        rank = self.account_rank()
 
-                if neighbor == start_node:
-                    # Cycle found!
-                    # Only accept if cycle length >= 3
-                    if len(stack) >= 3:
-                        
-                        if len(stack) > self.cycle_length :
-                            self.cycle_length = len(stack)
-                         
-                        first_edge_time = stack[1][1] if len(stack) > 1 else datetime.min
-                        if len(stack) > 1 and edge_timestamp <= first_edge_time:
-                             continue
+        # Payroll and merchant accounts can sit inside a loop but never start one
+        skip_start = self.accounts.has_tag("payroll") | self.accounts.has_tag("merchant")
+        if self.temporal:
+            time_window = int((self.time_window or self.TEMPORAL_WINDOW).total_seconds())
+            return TemporalCycleSearch(self.graph, rank, skip_start, self.max_cycle_length, time_window)
+        time_window = int(self.time_window.total_seconds()) if self.time_window is not None else None
+        return CycleSearch(self.graph, rank, skip_start, self.max_cycle_length, time_window)
 
-                        self._record_loop(stack)
-                else:
-                    
-                    next_min_time = min_timestamp
-                    if len(stack) == 1:
-                        # This is the first edge from start_node.
-                        # Subsequent edges must be after this one.
-                        next_min_time = edge_timestamp
-                    
-                    self._circuit(start_node, neighbor, stack, next_min_time)
-        
-        stack.pop()
+    def _record_loop(self, path: List[int]):
+        self.report_loop(self.graph.account_ids[path].tolist())
 
-    def _record_loop(self, stack: List[Tuple[str, datetime]]):
+    def report_loop(self, members: List[str]):
+        """Numbers, records and scores one loop; also used to replay stored loops."""
         # Access the global NetworkBuilder instance to build networks immediately upon loop detection
-        members = [node for node, _ in stack]
+        self.cycle_length = max(self.cycle_length, len(members))
         
         # Structure nodes by distance
         # "store the value of nodes by appending to the array at index... index is the distance"
@@ -114,6 +96,7 @@ class LoopDetector(BasePatternDetector):
             members=members,
             nodes_by_distance=nodes_by_distance,
         )
+        self.loops_detected[ring_id] = detail
         
         if self.network_builder:
             self.network_builder.built_networks(ring_id, detail) # Build network for this loop immediately
@@ -126,6 +109,6 @@ class LoopDetector(BasePatternDetector):
         """
         for member_id in members:
             if member_id in self.accounts:
-                self.accounts[member_id].IncSuspiciousScore(80.0)
-                if "ringtype:loop" not in self.accounts[member_id].tags:
-                    self.accounts[member_id].tags.append("ringtype:loop")
+                profile = self.accounts[member_id]
+                profile.IncSuspiciousScore(80.0)
+                profile.add_tag("ringtype:loop")
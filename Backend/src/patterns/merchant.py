@@ -1,12 +1,12 @@
 from datetime import timedelta
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Iterable
 from src.patterns.base_detector import BasePatternDetector
 import numpy as np
 
 class MerchantDetector(BasePatternDetector):
     # Tunable parameters
 
-    def detect(self):
+    def detect(self, nodes: Iterable[int] = None):
         print("Detecting Merchant accounts...")
 
         # Avg Transctions value
@@ -14,26 +14,24 @@ class MerchantDetector(BasePatternDetector):
           
         # Pre-calculate counts for efficiency and to find max
         
-        for account_id, profile in self.accounts.items():
+        for profile in self._profiles(nodes):
+            account_id = profile.account_id
             # Incoming transactions count
 
-            if account_id in self.reverse_adjacency_list:
-                incoming_count = len(self.reverse_adjacency_list[account_id])
-            else:
-                incoming_count = 0
+            node = profile.index
+            in_start, in_end = self.graph.in_range(node)
+            incoming_count = in_end - in_start
             
             # Outgoing transactions count
             
-            if account_id in self.adjacency_list:
-                outgoing_count = len(self.adjacency_list[account_id])
-            else:
-                outgoing_count = 0
+            out_start, out_end = self.graph.out_range(node)
+            outgoing_count = out_end - out_start
             
             max_trx = incoming_count + outgoing_count
             
             # unique_senders is already in profile
-            senders = len(profile.unique_senders) 
-            recivers  = len(profile.unique_receivers)
+            senders = profile.unique_senders_count
+            recivers  = profile.unique_receivers_count
             max_acc = senders + recivers
             
         
@@ -49,7 +47,8 @@ class MerchantDetector(BasePatternDetector):
             if volume < 0.15 or volume > 0.35 :
                 continue
 
-            variance = np.std(self.adjacency_list[account_id]+self.reverse_adjacency_list[account_id])
+            amounts = np.concatenate((self.graph.out_amounts[out_start:out_end], self.graph.in_amounts[in_start:in_end]))
+            variance = np.std(amounts)
             
             if variance < 70 :
                 continue
@@ -1,5 +1,5 @@
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Iterable
 from collections import defaultdict
 from src.patterns.base_detector import BasePatternDetector
 
@@ -10,27 +10,23 @@ class PayrollDetector(BasePatternDetector):
     MONTHLY_WINDOW_DAYS = 7
     CONSISTENCY_WINDOW_DAYS = 7
 
-    def detect(self):
+    def detect(self, nodes: Iterable[int] = None):
         print("Detecting payroll patterns...")
-        for account_id, profile in self.accounts.items():
-            if "merchant" in profile.tags:
+        for profile in self._profiles(nodes):
+            if profile.has_tag("merchant"):
                 continue
             # 1. Threshold Check
-            if len(profile.unique_receivers) <= self.UNIQUE_RECEIVER_THRESHOLD:
+            if profile.unique_receivers_count <= self.UNIQUE_RECEIVER_THRESHOLD:
                 continue
 
             # 2. Get outgoing transactions
-            if account_id not in self.adjacency_list:
-                continue
-            
-            outgoing_txs = self.adjacency_list[account_id]
-            if not outgoing_txs:
+            start, end = self.graph.out_range(profile.index)
+            if start == end:
                 continue
 
             # 3. Group by (Year, Month)
             tx_by_month = defaultdict(list)
-            for tx in outgoing_txs:
-                dt = tx['timestamp']
+            for dt in self.graph.out_timestamps[start:end].tolist():
                 tx_by_month[(dt.year, dt.month)].append(dt)
 
             # 4. Periodicity Check
@@ -1,15 +1,18 @@
 from src.patterns.base_detector import BasePatternDetector
 from src.clustering.network_builder import NetworkBuilder
 from src.models.ring_detail import RingDetail
-from typing import Dict, Any
+from src.core.csr_graph import CsrGraph
+from typing import Dict, Any, List, Iterable
 
 class ShellDetector(BasePatternDetector):
-    def __init__(self, accounts: Dict[str, Any], adjacency_list: Dict[str, Any], network_builder: NetworkBuilder = None):
-        super().__init__(accounts, adjacency_list)
+    def __init__(self, accounts: Dict[str, Any], graph: CsrGraph, network_builder: NetworkBuilder = None):
+        super().__init__(accounts, graph)
         self.network_builder = network_builder
-    def detect(self):
+        self.shells: List[str] = []
+    def detect(self, nodes: Iterable[int] = None):
         print("Detecting shell accounts...")
-        for account_id, profile in self.accounts.items():
+        for profile in self._profiles(nodes):
+            account_id = profile.account_id
             if not profile.first_seen_time or not profile.last_seen_time:
                 continue
 
@@ -26,18 +29,23 @@ class ShellDetector(BasePatternDetector):
                     balanced_flow = True
             
             if short_lifecycle and few_transactions and balanced_flow:
-                profile.IncSuspiciousScore(60.0)
-                if "ringtype:shell" not in profile.tags:
-                    profile.tags.append("ringtype:shell")
-                
-                if self.network_builder:
-                    ring_id = f"SHELL_{account_id}"
-                    members = [account_id]
-                    nodes_by_distance = [members]
-                    
-                    detail = RingDetail(
-                        ring_id=ring_id,
-                        members=members,
-                        nodes_by_distance=nodes_by_distance
-                    )
-                    self.network_builder.built_networks(ring_id, detail)
+                self.report_shell(account_id)
+
+    def report_shell(self, account_id: str):
+        """Scores and records one shell account; also used to replay stored shells."""
+        self.shells.append(account_id)
+        profile = self.accounts[account_id]
+        profile.IncSuspiciousScore(60.0)
+        profile.add_tag("ringtype:shell")
+        
+        if self.network_builder:
+            ring_id = f"SHELL_{account_id}"
+            members = [account_id]
+            nodes_by_distance = [members]
+            
+            detail = RingDetail(
+                ring_id=ring_id,
+                members=members,
+                nodes_by_distance=nodes_by_distance
+            )
+            self.network_builder.built_networks(ring_id, detail)
@@ -0,0 +1,135 @@
+import heapq
+from typing import Dict, List, Tuple, Iterator, Optional, Set
+import numpy as np
+from src.core.csr_graph import CsrGraph
+from src.patterns.cycle_search import CycleSearch
+
+class TemporalCycleSearch(CycleSearch):
+    """
+    Time-respecting cycle enumeration: every edge of a cycle is later than the one
+    before it, and the whole cycle completes within time_window (seconds) of its first
+    edge. A cycle therefore starts at the sender of its earliest edge; there is no
+    lowest-node rule, and parallel edges still count as distinct cycles.
+
+    Paths only follow edges inside (arrival time, t0 + time_window], found by binary
+    search over the time-sorted CSR slices. Before searching from a start, a reverse pass
+    works out for each node the latest time it can still be left and reach the start in
+    time; edges that arrive too late for that are never explored.
+    """
+
+    def __init__(self, graph: CsrGraph, rank: np.ndarray, skip_start: np.ndarray = None,
+                 max_length: Optional[int] = None, time_window: int = 72 * 3600):
+        super().__init__(graph, rank, skip_start, max_length, time_window)
+        self._in_timestamps = graph.in_timestamps.astype(np.int64)
+        # First edges within this span share one latest-departure pass
+        self._bound_span = max(1, time_window // 4)
+
+    def cycles(self, components: List[List[int]] = None) -> Iterator[Tuple[int, List[int]]]:
+        """All temporal cycles (or those of the given components) as (start, path), starts in increasing rank."""
+        starts = []
+        for component in components if components is not None else self.components():
+            members = set(component)
+            starts.extend((self.rank[v], v, members) for v in component)
+        starts.sort(key=lambda item: item[0])
+        for _, start, members in starts:
+            for path in self._cycles_from_start(start, members):
+                yield start, path
+
+    def cycles_in_range(self, component: List[int], low: int, high: int) -> Iterator[Tuple[int, List[int]]]:
+        # Temporal cycles stay inside one static SCC, so the component is the search space
+        members = set(component)
+        starts = sorted((v for v in component if low <= self.rank[v] <= high), key=self.rank.__getitem__)
+        for start in starts:
+            for path in self._cycles_from_start(start, members):
+                yield start, path
+
+    def _cycles_from_start(self, start: int, members: Set[int]) -> List[List[int]]:
+        if self.skip_start[start]:
+            return []
+        graph = self.graph
+        begin, end = graph.out_offsets[start], graph.out_offsets[start + 1]
+        found = []
+        latest = None
+        bound_until = None
+        for e in range(begin, end):
+            v = int(graph.out_neighbors[e])
+            if v not in members:
+                continue
+            t0 = int(self._timestamps[e])
+            if bound_until is None or t0 > bound_until:
+                bound_until = t0 + self._bound_span
+                latest = self._latest_departure(start, members, t0, bound_until + self.time_window)
+            # v must still be able to get back to start after t0
+            if t0 >= latest.get(v, t0):
+                continue
+            found.extend(self._search_from_edge(start, v, t0, members, latest))
+        return found
+
+    def _latest_departure(self, start: int, members: Set[int], t_low: int, t_end: int) -> Dict[int, int]:
+        """
+        For each node, the latest edge time at which it can be left and still reach start
+        by t_end along increasing edges later than t_low (reverse Dijkstra on max time).
+        """
+        graph = self.graph
+        offsets, neighbors, timestamps = graph.in_offsets, graph.in_neighbors, self._in_timestamps
+        latest: Dict[int, int] = {start: t_end + 1}
+        heap = [(-(t_end + 1), start)]
+        done: Set[int] = set()
+        while heap:
+            limit, u = heapq.heappop(heap)
+            if u in done:
+                continue
+            done.add(u)
+            limit = -limit
+            begin, end = offsets[u], offsets[u + 1]
+            times = timestamps[begin:end]
+            lo = begin + np.searchsorted(times, t_low, side="right")
+            hi = begin + np.searchsorted(times, limit, side="left")
+            for x, t in zip(neighbors[lo:hi].tolist(), timestamps[lo:hi].tolist()):
+                if x in members and x not in done and t > latest.get(x, t_low):
+                    latest[x] = t
+                    heapq.heappush(heap, (-t, x))
+        return latest
+
+    def _search_from_edge(self, start: int, first: int, t0: int, members: Set[int], latest: Dict[int, int]) -> List[List[int]]:
+        graph = self.graph
+        offsets, neighbors, timestamps = graph.out_offsets, graph.out_neighbors, self._timestamps
+        t_end = t0 + self.time_window
+        max_length = self.max_length
+
+        found = []
+        path = [start, first]
+        on_path = {start, first}
+        # Each frame is [next edge, end edge]: the out-edges of the path's last node
+        # that leave after it was reached and no later than t_end
+        stack = [self._edge_range(first, t0, t_end)]
+        while stack:
+            frame = stack[-1]
+            if frame[0] >= frame[1]:
+                stack.pop()
+                on_path.discard(path.pop())
+                continue
+            e = frame[0]
+            frame[0] += 1
+            w = int(neighbors[e])
+            if w == start:
+                if len(path) >= self.MIN_LENGTH:
+                    found.append(list(path))
+                continue
+            if w in on_path or w not in members:
+                continue
+            if max_length is not None and len(path) >= max_length:
+                continue
+            t = int(timestamps[e])
+            if t >= latest.get(w, t):
+                continue
+            path.append(w)
+            on_path.add(w)
+            stack.append(self._edge_range(w, t, t_end))
+        return found
+
+    def _edge_range(self, node: int, after: int, until: int) -> List[int]:
+        begin, end = self.graph.out_offsets[node], self.graph.out_offsets[node + 1]
+        times = self._timestamps[begin:end]
+        return [int(begin + np.searchsorted(times, after, side="right")),
+                int(begin + np.searchsorted(times, until, side="right"))]
@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Dict, Iterable
 from src.models.account_profile import AccountProfile
 
 class AccountScorer:
@@ -6,9 +6,11 @@ class AccountScorer:
         self.accounts = accounts
         
 
-    def score_accounts(self):
+    def score_accounts(self, account_ids: Iterable[str] = None):
         print("Calculating final account suspicious scores...")
-        for account_id, profile in self.accounts.items():
+        # account_ids limits scoring to those accounts (incremental runs)
+        profiles = self.accounts.items() if account_ids is None else ((a, self.accounts[a]) for a in account_ids)
+        for account_id, profile in profiles:
             
             if profile.total_sent > 10000: # Arbitrary threshold
                  profile.suspicious_score += 15
@@ -0,0 +1,58 @@
+import os
+import sys
+import json
+import subprocess
+import numpy as np
+import pytest
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(BACKEND, "src", "main.py")
+sys.path.insert(0, BACKEND)
+
+
+def write_transactions(path: str, rows: int, seed: int, noise_accounts: int = None):
+    """Seeded random transactions between noise_accounts accounts (default rows // 2), minute-resolution times."""
+    rng = np.random.default_rng(seed)
+    accounts = noise_accounts or max(10, rows // 2)
+    sender = rng.integers(0, accounts, size=rows)
+    receiver = (sender + rng.integers(1, accounts, size=rows)) % accounts
+    amount = np.round(rng.uniform(10, 5000, size=rows), 2)
+    minutes = rng.integers(0, 90 * 24 * 60, size=rows)
+    timestamps = np.datetime_as_string(np.datetime64("2023-01-01T00:00") + minutes.astype("timedelta64[m]"), unit="s")
+    with open(path, "w") as f:
+        f.write("transaction_id,sender_id,receiver_id,amount,timestamp\n")
+        for i in range(rows):
+            f.write(f"TX{i:08d},U_{sender[i]},U_{receiver[i]},{amount[i]},{timestamps[i].replace('T', ' ')}\n")
+
+
+@pytest.fixture(scope="session")
+def dataset(tmp_path_factory):
+    """generate(rows, seed, **write_transactions options) -> path of a seeded CSV, made once per session."""
+    made = {}
+
+    def generate(rows: int, seed: int, **options) -> str:
+        key = (rows, seed, tuple(sorted(options.items())))
+        if key not in made:
+            path = str(tmp_path_factory.mktemp("data") / f"tx_{rows}_s{seed}.csv")
+            write_transactions(path, rows, seed, **options)
+            made[key] = path
+        return made[key]
+    return generate
+
+
+@pytest.fixture
+def run_main():
+    """run(csv, *flags) -> (output.json, download.json) of a main.py run, reports next to the csv."""
+    def run(csv_path: str, *flags: str):
+        result = subprocess.run([sys.executable, MAIN, csv_path, *flags], cwd=os.path.dirname(csv_path),
+                                capture_output=True, text=True)
+        assert result.returncode == 0, result.stdout + result.stderr
+        directory = os.path.dirname(csv_path)
+        with open(os.path.join(directory, "output.json")) as f:
+            output = json.load(f)
+        with open(os.path.join(directory, "download.json")) as f:
+            download = json.load(f)
+        # The only field that differs between equivalent runs
+        download["summary"].pop("processing_time_seconds")
+        return output, download
+    return run
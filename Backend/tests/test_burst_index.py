@@ -0,0 +1,40 @@
+from datetime import timedelta
+import numpy as np
+import pytest
+from src.core.data_loader import DataLoader
+from src.core.graph_builder import GraphBuilder
+from src.patterns.dispersal import DispersalDetector
+
+
+@pytest.fixture(scope="module")
+def graph(dataset):
+    builder = GraphBuilder(DataLoader(dataset(5000, 2, noise_accounts=300)).load_columns())
+    builder.build_graph()
+    return builder.graph
+
+
+def scan_bursts(graph, node: int, outgoing: bool, time_limit: np.timedelta64):
+    """The per-visit scan _bfs_burst used to do: burst counterparties of one node, first-seen order."""
+    if outgoing:
+        offsets, neighbors, timestamps = graph.out_offsets, graph.out_neighbors, graph.out_timestamps
+    else:
+        offsets, neighbors, timestamps = graph.in_offsets, graph.in_neighbors, graph.in_timestamps
+    times = timestamps[offsets[node]:offsets[node + 1]].tolist()
+    found = []
+    for i, neighbor in enumerate(neighbors[offsets[node]:offsets[node + 1]].tolist()):
+        close_before = i > 0 and times[i] - times[i - 1] <= time_limit
+        close_after = i + 1 < len(times) and times[i + 1] - times[i] <= time_limit
+        if close_before or close_after:
+            found.append(neighbor)
+    return list(dict.fromkeys(found)), bool(found)
+
+
+@pytest.mark.parametrize("outgoing", [True, False])
+@pytest.mark.parametrize("time_limit", [DispersalDetector.TIME_LIMIT, timedelta(days=1)])
+def test_burst_index_matches_scan(graph, outgoing, time_limit):
+    has_burst, offsets, neighbors = graph.burst_index(outgoing, np.timedelta64(time_limit))
+    assert has_burst.any()
+    for node in range(graph.num_nodes):
+        expected, expected_burst = scan_bursts(graph, node, outgoing, time_limit)
+        assert has_burst[node] == expected_burst
+        assert neighbors[offsets[node]:offsets[node + 1]].tolist() == expected
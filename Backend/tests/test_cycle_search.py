@@ -0,0 +1,130 @@
+import multiprocessing as mp
+import numpy as np
+import pytest
+from src.core.data_loader import DataLoader
+from src.core.graph_builder import GraphBuilder
+from src.patterns.cycle_search import CycleSearch
+from src.patterns.temporal_cycles import TemporalCycleSearch
+
+WINDOW = 30 * 24 * 3600
+
+
+def build_graph(path: str):
+    builder = GraphBuilder(DataLoader(path).load_columns())
+    builder.build_graph()
+    graph = builder.graph
+    # As in LoopDetector: starts are visited in account id order
+    nodes = np.argsort(graph.account_ids, kind="stable")
+    rank = np.empty(graph.num_nodes, dtype=np.int64)
+    rank[nodes] = np.arange(len(nodes))
+    return graph, rank
+
+
+@pytest.fixture(scope="module")
+def dense(dataset):
+    """~8k cycles with no length bound."""
+    return build_graph(dataset(150, 4, noise_accounts=80))
+
+
+@pytest.fixture(scope="module")
+def medium(dataset):
+    return build_graph(dataset(1500, 3, noise_accounts=150))
+
+
+def brute_force_cycles(graph, rank, max_length=None, time_window=None):
+    """
+    Plain DFS from every node in rank order, through higher-ranked nodes only, each edge
+    in CSR (time) order. With time_window, one search per first edge, every edge within
+    [t0, t0 + time_window].
+    """
+    offsets, neighbors = graph.out_offsets, graph.out_neighbors
+    times = graph.out_timestamps.astype(np.int64)
+    found = []
+
+    def extend(start, path, edges, low, high):
+        for e in edges:
+            w, t = int(neighbors[e]), int(times[e])
+            if low is not None and not low <= t <= high:
+                continue
+            if w == start:
+                if len(path) >= CycleSearch.MIN_LENGTH:
+                    found.append((start, list(path)))
+            elif rank[w] > rank[start] and w not in path and (max_length is None or len(path) < max_length):
+                path.append(w)
+                extend(start, path, range(offsets[w], offsets[w + 1]), low, high)
+                path.pop()
+
+    for start in np.argsort(rank).tolist():
+        edges = range(offsets[start], offsets[start + 1])
+        if time_window is None:
+            extend(start, [start], edges, None, None)
+        else:
+            for e in edges:
+                extend(start, [start], [e], int(times[e]), int(times[e]) + time_window)
+    return found
+
+
+def brute_force_temporal_cycles(graph, max_length, time_window):
+    """Every cycle whose edges are strictly increasing in time, within time_window of the first."""
+    offsets, neighbors = graph.out_offsets, graph.out_neighbors
+    times = graph.out_timestamps.astype(np.int64)
+    found = []
+
+    def extend(start, path, after, until):
+        v = path[-1]
+        for e in range(offsets[v], offsets[v + 1]):
+            w, t = int(neighbors[e]), int(times[e])
+            if not after < t <= until:
+                continue
+            if w == start:
+                if len(path) >= CycleSearch.MIN_LENGTH:
+                    found.append((start, list(path)))
+            elif w not in path and (max_length is None or len(path) < max_length):
+                path.append(w)
+                extend(start, path, t, until)
+                path.pop()
+
+    for start in range(graph.num_nodes):
+        for e in range(offsets[start], offsets[start + 1]):
+            w, t0 = int(neighbors[e]), int(times[e])
+            if w != start:
+                extend(start, [start, w], t0, t0 + time_window)
+    return found
+
+
+def test_unbounded_cycles_match_brute_force(dense):
+    graph, rank = dense
+    cycles = list(CycleSearch(graph, rank).cycles())
+    assert len(cycles) > 1000
+    # Same cycles, in the same order (LOOP_n ids depend on it)
+    assert cycles == brute_force_cycles(graph, rank)
+
+
+@pytest.mark.parametrize("max_length", [3, 4, 5])
+def test_bounded_cycles_match_brute_force(medium, max_length):
+    graph, rank = medium
+    assert list(CycleSearch(graph, rank, max_length=max_length).cycles()) == brute_force_cycles(graph, rank, max_length)
+
+
+def test_windowed_cycles_match_brute_force(medium):
+    graph, rank = medium
+    cycles = list(CycleSearch(graph, rank, max_length=5, time_window=WINDOW).cycles())
+    assert cycles
+    assert cycles == brute_force_cycles(graph, rank, 5, WINDOW)
+
+
+@pytest.mark.parametrize("max_length", [None, 5])
+def test_temporal_cycles_match_brute_force(medium, max_length):
+    graph, rank = medium
+    cycles = list(TemporalCycleSearch(graph, rank, max_length=max_length, time_window=WINDOW).cycles())
+    assert cycles
+    assert sorted(cycles) == sorted(brute_force_temporal_cycles(graph, max_length, WINDOW))
+
+
+@pytest.mark.skipif("fork" not in mp.get_all_start_methods(), reason="parallel search needs fork")
+@pytest.mark.parametrize("search_class", [CycleSearch, TemporalCycleSearch])
+def test_parallel_search_matches_serial(medium, search_class):
+    graph, rank = medium
+    options = dict(max_length=5, time_window=WINDOW) if search_class is TemporalCycleSearch else dict(max_length=5)
+    serial = list(search_class(graph, rank, **options).cycles())
+    assert search_class(graph, rank, **options).cycles_parallel(2) == serial
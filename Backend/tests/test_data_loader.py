@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from src.core.data_loader import DataLoader
+from src.core.graph_builder import GraphBuilder
+from src.models.transaction_batch import TransactionBatch
+
+COLUMNS = ("transaction_ids", "sender", "receiver", "amount", "timestamp", "account_ids")
+
+
+def assert_same_batch(actual: TransactionBatch, expected: TransactionBatch):
+    assert len(actual) == len(expected)
+    for name in COLUMNS:
+        assert np.array_equal(getattr(actual, name), getattr(expected, name)), name
+
+
+@pytest.fixture(scope="module")
+def with_duplicates(dataset, tmp_path_factory):
+    """A generated file plus 3,000 repeated transaction ids, half of them with changed amount and timestamp."""
+    with open(dataset(20000, 8)) as f:
+        header, *rows = f.read().splitlines()
+    rng = np.random.default_rng(8)
+    repeated = []
+    for i, row in enumerate(rng.choice(rows, size=3000, replace=False).tolist()):
+        fields = row.split(",")
+        if i % 2:
+            fields[3] = str(float(fields[3]) + 1)
+            fields[4] = "2023-06-01 12:00:00" if i % 4 == 1 else fields[4]
+        repeated.append(",".join(fields))
+    rows = rows + repeated
+    rng.shuffle(rows)
+    path = tmp_path_factory.mktemp("duplicates") / "tx.csv"
+    path.write_text("\n".join([header] + rows) + "\n")
+    return str(path)
+
+
+def test_columnar_load_matches_rows(with_duplicates):
+    loader = DataLoader(with_duplicates)
+    batch = loader.load_columns()
+    transactions = loader.load_transactions()
+    assert len(batch) == len(transactions) == 20000
+
+    assert batch.transaction_ids.tolist() == list(transactions)
+    rows = list(transactions.values())
+    assert batch.account_ids[batch.sender].tolist() == [tx.sender_id for tx in rows]
+    assert batch.account_ids[batch.receiver].tolist() == [tx.receiver_id for tx in rows]
+    assert batch.amount.tolist() == [tx.amount for tx in rows]
+    assert batch.timestamp.tolist() == [tx.timestamp for tx in rows]
+    # Accounts are numbered in order of first appearance, sender before receiver
+    pairs = np.column_stack([batch.sender, batch.receiver]).ravel()
+    _, first = np.unique(pairs, return_index=True)
+    assert np.all(np.diff(first) > 0)
+
+
+@pytest.mark.parametrize("chunk_size", [1000, 7777])
+def test_streamed_graph_matches_whole_load(with_duplicates, chunk_size):
+    loader = DataLoader(with_duplicates)
+    builder = GraphBuilder()
+    for chunk in loader.iter_chunks(chunk_size):
+        builder.add_chunk(chunk)
+    builder.finalize()
+    assert_same_batch(builder.graph.batch, loader.load_columns())
@@ -0,0 +1,42 @@
+import pytest
+
+ROWS = 6000
+
+
+@pytest.fixture(scope="module")
+def rows(dataset):
+    with open(dataset(ROWS, 9)) as f:
+        header, *rows = f.read().splitlines()
+    return header, rows
+
+
+def run_batches(tmp_path, run_main, header, batches, *flags):
+    """Runs main.py on each batch in turn with one --state-dir; the last run's reports."""
+    for i, batch in enumerate(batches):
+        path = tmp_path / f"batch{i}.csv"
+        path.write_text("\n".join([header] + batch) + "\n")
+        reports = run_main(str(path), "--state-dir", str(tmp_path / "state"), *flags)
+    return reports
+
+
+@pytest.fixture(scope="module")
+def full_run(rows, tmp_path_factory):
+    header, body = rows
+    path = tmp_path_factory.mktemp("full") / "all.csv"
+    path.write_text("\n".join([header] + body) + "\n")
+    return str(path)
+
+
+@pytest.mark.parametrize("parts", [2, 3])
+def test_batches_match_full_run(rows, full_run, tmp_path, run_main, parts):
+    header, body = rows
+    step = -(-len(body) // parts)
+    batches = [body[i:i + step] for i in range(0, len(body), step)]
+    assert run_batches(tmp_path, run_main, header, batches) == run_main(full_run)
+
+
+def test_temporal_batches_match_full_run(rows, full_run, tmp_path, run_main):
+    header, body = rows
+    half = len(body) // 2
+    flags = ("--temporal-loops", "--max-cycle-length", "6")
+    assert run_batches(tmp_path, run_main, header, [body[:half], body[half:]], *flags) == run_main(full_run, *flags)